@@ -1,8 +1,13 @@
 # coaches/management/commands/import_coaches.py
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
 from coaches.models import Coach
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
+from scraper import client
+from scraper.parsing import parse_html
+from scraper.ratelimit import HostRateLimiter
 import time
 import re
 
@@ -15,8 +20,31 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing coach data before import',
         )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=2.0,
+            help='Starting requests per second to each district host',
+        )
+        parser.add_argument(
+            '--max-rate',
+            type=float,
+            default=8.0,
+            help='Most requests per second to each district host',
+        )
+        parser.add_argument(
+            '--per-host',
+            type=int,
+            default=2,
+            help='Most requests in flight to each district host',
+        )
+        client.add_transport_arguments(parser)
     
     def handle(self, *args, **options):
+        if options['rate'] <= 0 or options['max_rate'] < options['rate'] or options['per_host'] < 1:
+            raise CommandError('Need 0 < --rate <= --max-rate and --per-host of at least 1')
+        client.configure_from_options(options)
+        
         if options['clear']:
             self.stdout.write('Clearing existing coach data...')
             Coach.objects.all().delete()
@@ -32,43 +60,101 @@ class Command(BaseCommand):
             'https://seisa.hssailing.org/schools'
         ]
         
+        # Each district host gets its own adaptive rate limit
+        self.limiter = HostRateLimiter(rate=options['rate'], max_rate=options['max_rate'])
+        
+        # Fetch the districts concurrently; database writes stay on this thread
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(district_urls)) as executor:
+            futures = [
+                executor.submit(self.scrape_district, district_url, options['per_host'])
+                for district_url in district_urls
+            ]
+            scraped = [future.result() for future in futures]
+        
         total_schools = 0
+        for district_schools in scraped:
+            total_schools += self.save_coaches(district_schools)
         
-        # Scrape each district
-        for district_url in district_urls:
-            schools = self.scrape_schools_from_district(district_url)
-            
-            # Scrape coach info for each school
-            for school in schools:
-                self.stdout.write(f"Scraping coach info for: {school['name']}")
-                coach_info = self.scrape_coach_info(school['url'])
-                
-                # Create or update the Coach record
-                coach, created = Coach.objects.update_or_create(
-                    school_name=school['name'],
-                    district=school['district'],
-                    defaults={
-                        'location': school['location'],
-                        'league': school['league'],
-                        'first_name': coach_info['first_name'],
-                        'last_name': coach_info['last_name'],
-                        'phone': coach_info['phone'],
-                        'email': coach_info['email'],
-                        'school_url': school['url']
-                    }
-                )
-                
-                if created:
-                    self.stdout.write(self.style.SUCCESS(f"Added: {school['name']}"))
-                else:
-                    self.stdout.write(self.style.WARNING(f"Updated: {school['name']}"))
-                
-                total_schools += 1
-                
-                # Add a small delay to avoid overloading the server
-                time.sleep(1)
+        for host, bucket in self.limiter.buckets.items():
+            self.stdout.write(
+                f"{host}: {bucket.stats['requests']} requests, {bucket.stats['backoffs']} backoffs, "
+                f"ended at {bucket.rate:.2f} requests/s"
+            )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully processed {total_schools} schools in {time.perf_counter() - started:.1f}s"
+        ))
+    
+    def fetch(self, url):
+        """GET a page through the shared session, within its host's rate limit"""
+        return self.limiter.get(client.get, url)
+    
+    def scrape_district(self, district_url, per_host):
+        """
+        Scrape a district's school list and every school's coach info
+        Returns a list of (school, coach_info) tuples
+        """
+        schools = self.scrape_schools_from_district(district_url)
+        
+        def scrape_school(school):
+            self.stdout.write(f"Scraping coach info for: {school['name']}")
+            return school, self.scrape_coach_info(school['url'])
+        
+        # The limiter paces the host; per_host only caps requests in flight
+        with ThreadPoolExecutor(max_workers=per_host) as executor:
+            return list(executor.map(scrape_school, schools))
+    
+    def save_coaches(self, scraped):
+        """
+        Create or update the Coach records of one district in a single batch
+        Returns the number of schools processed
+        """
+        if not scraped:
+            return 0
+        
+        fields = ['location', 'league', 'first_name', 'last_name', 'phone', 'email', 'school_url']
+        
+        # Later rows for the same school win, as they did with update_or_create
+        rows = {}
+        for school, coach_info in scraped:
+            rows[(school['name'], school['district'])] = {
+                'location': school['location'],
+                'league': school['league'],
+                'first_name': coach_info['first_name'],
+                'last_name': coach_info['last_name'],
+                'phone': coach_info['phone'],
+                'email': coach_info['email'],
+                'school_url': school['url']
+            }
+        
+        districts = {district for _, district in rows}
+        existing = {
+            (coach.school_name, coach.district): coach
+            for coach in Coach.objects.filter(district__in=districts, school_name__in=[name for name, _ in rows])
+        }
+        
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for (school_name, district), values in rows.items():
+            coach = existing.get((school_name, district))
+            if coach is None:
+                to_create.append(Coach(school_name=school_name, district=district, **values))
+                self.stdout.write(self.style.SUCCESS(f"Added: {school_name}"))
+            else:
+                for field, value in values.items():
+                    setattr(coach, field, value)
+                # bulk_update skips auto_now, so set it by hand
+                coach.date_updated = now
+                to_update.append(coach)
+                self.stdout.write(self.style.WARNING(f"Updated: {school_name}"))
+        
+        with transaction.atomic():
+            Coach.objects.bulk_create(to_create, batch_size=500)
+            Coach.objects.bulk_update(to_update, fields + ['date_updated'], batch_size=500)
         
-        self.stdout.write(self.style.SUCCESS(f"Successfully processed {total_schools} schools"))
+        return len(scraped)
     
     def scrape_schools_from_district(self, district_url):
         """
@@ -78,13 +164,14 @@ class Command(BaseCommand):
         self.stdout.write(f"Scraping district: {district_url}")
         
         try:
-            response = requests.get(district_url)
+            response = self.fetch(district_url)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             self.stdout.write(self.style.ERROR(f"Error accessing district page: {e}"))
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Only the schools table is read
+        soup = parse_html(response.text, only='table')
         
         # Extract district name from URL for reference
         district_name = district_url.split('/')[2].split('.')[0].upper()
@@ -149,7 +236,7 @@ class Command(BaseCommand):
         Returns a dictionary with coach name, phone, and email
         """
         try:
-            response = requests.get(school_url)
+            response = self.fetch(school_url)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             self.stdout.write(self.style.ERROR(f"Error accessing school page: {e}"))
@@ -160,7 +247,8 @@ class Command(BaseCommand):
                 'email': '<blank>'
             }
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Only the school info table is read
+        soup = parse_html(response.text, only='table')
         
         # Find all tables
         tables = soup.find_all('table')
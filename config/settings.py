@@ -82,4 +82,21 @@ TEMPLATES = [
             ],
         },
     },
-]
\ No newline at end of file
+]
+# Scraping
+SCRAPE_BASE_URL = os.environ.get('SCRAPE_BASE_URL', 'https://scores.hssailing.org')  # Scoring site season pages live under
+SCRAPE_MAX_WORKERS = int(os.environ.get('SCRAPE_MAX_WORKERS', '8'))  # Regatta pages fetched at once
+SCRAPE_PARSE_WORKERS = int(os.environ.get('SCRAPE_PARSE_WORKERS', '2'))  # Regatta pages parsed at once
+SCRAPE_SEASON_WORKERS = int(os.environ.get('SCRAPE_SEASON_WORKERS', '2'))  # Seasons listed at once
+SCRAPE_QUEUE_SIZE = int(os.environ.get('SCRAPE_QUEUE_SIZE', '32'))  # Pages waiting between ingestion stages
+SCRAPE_TIMEOUT = float(os.environ.get('SCRAPE_TIMEOUT', '30'))  # Seconds per request
+SCRAPE_RETRIES = int(os.environ.get('SCRAPE_RETRIES', '3'))  # Retries on 5xx and connection errors
+SCRAPE_CACHE_DIR = os.environ.get('SCRAPE_CACHE_DIR', os.path.join(BASE_DIR, 'scrape_cache'))  # Empty disables the page cache
+SCRAPE_CACHE_CLOSED_SEASONS = os.environ.get('SCRAPE_CACHE_CLOSED_SEASONS', 'True') == 'True'  # Never refetch pages of regattas that are over
+SCRAPE_PARSER = os.environ.get('SCRAPE_PARSER', '')  # 'lxml' or 'html.parser'; empty picks the fastest installed
+SCRAPE_TRANSPORT = os.environ.get('SCRAPE_TRANSPORT', 'live')  # 'live', 'archive' (offline) or 'record'
+SCRAPE_ARCHIVE_DIR = os.environ.get('SCRAPE_ARCHIVE_DIR', os.path.join(BASE_DIR, 'scrape_archive'))  # Pages for archive and record
+SCRAPE_DEBUG_HTML = os.environ.get('SCRAPE_DEBUG_HTML', 'False') == 'True'  # Save each season listing as {season}_debug.html in the working directory
+SCRAPE_JOB_HEARTBEAT = float(os.environ.get('SCRAPE_JOB_HEARTBEAT', '30'))  # Seconds between heartbeats of a running job
+SCRAPE_JOB_TIMEOUT = float(os.environ.get('SCRAPE_JOB_TIMEOUT', '300'))  # Seconds without a heartbeat before a running job is failed
+SCRAPE_EVENT_POLL = float(os.environ.get('SCRAPE_EVENT_POLL', '1.0'))  # Seconds between event checks per streamed job
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import School, RegattaType, Regatta, Sailor, Result
+from .models import School, RegattaType, Regatta, Sailor, Result, ScrapeJob, ScrapeRun
 
 @admin.register(School)
 class SchoolAdmin(admin.ModelAdmin):
@@ -18,12 +18,21 @@ class RegattaAdmin(admin.ModelAdmin):
 
 @admin.register(Sailor)
 class SailorAdmin(admin.ModelAdmin):
-    list_display = ('name', 'school', 'elo_rating')
-    list_filter = ('school',)
+    list_display = ('name', 'school', 'elo_rating', 'grad_year', 'regatta_count', 'last_season')
+    list_filter = ('grad_year', 'school')
     search_fields = ('name', 'school__name')
 
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
     list_display = ('sailor', 'regatta', 'division', 'position', 'place')
     list_filter = ('division', 'position', 'regatta__season')
-    search_fields = ('sailor__name', 'regatta__name')
\ No newline at end of file
+    search_fields = ('sailor__name', 'regatta__name')
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ('season', 'status', 'regattas_done', 'regattas_total', 'rows_written', 'created', 'finished_at')
+    list_filter = ('status', 'season')
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created', 'started_at', 'finished_at', 'rating_date')
@@ -0,0 +1,39 @@
+# sailors/benchmarks.py
+
+import statistics
+import subprocess
+
+from django.conf import settings
+
+class QueryCounter:
+    """Database execute wrapper that counts queries without keeping them"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+def get_commit():
+    """Current git commit, so results can be matched to code"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def summarize(timings):
+    """Count, total, mean and percentiles of a list of timings in seconds"""
+    if not timings:
+        return {'count': 0, 'seconds': 0}
+    timings = sorted(timings)
+    return {
+        'count': len(timings),
+        'seconds': sum(timings),
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+    }
@@ -2,7 +2,12 @@
 
 import math
 from datetime import date
-from .models import Result, Regatta
+from functools import lru_cache
+
+import numpy as np
+
+# Rating multiplier for sailors who have not competed in the current season
+INACTIVE_DECAY = 0.97
 
 def get_current_season():
     """
@@ -19,6 +24,31 @@ def get_current_season():
     else:
         return f"s{year}"
 
+def get_season_ordinal(season):
+    """
+    Convert a season code to an increasing ordinal (s24 < f24 < s25)
+    
+    Args:
+        season (str): Season code (e.g., 'f23')
+    
+    Returns:
+        int: Season ordinal
+    """
+    return int(season[1:]) * 2 + (1 if season[0] == 'f' else 0)
+
+def get_season_from_ordinal(ordinal):
+    """
+    Convert a season ordinal back to its season code
+    
+    Args:
+        ordinal (int): Season ordinal from get_season_ordinal
+    
+    Returns:
+        str: Season code (e.g., 'f23')
+    """
+    year, is_fall = divmod(ordinal, 2)
+    return f"{'f' if is_fall else 's'}{year:02d}"
+
 def get_season_weight(season, current_season=None):
     """
     Calculate season weight based on historical influence
@@ -33,31 +63,24 @@ def get_season_weight(season, current_season=None):
     if not current_season:
         current_season = get_current_season()
     
-    # Extract season type and year
-    current_type = current_season[0]  # 'f' or 's'
-    current_year = int(current_season[1:])
-    
-    season_type = season[0]  # 'f' or 's'
-    season_year = int(season[1:])
-    
-    # Calculate number of seasons difference
-    seasons_diff = 0
+    # Number of seasons between the two (s25 is one season after f24)
+    seasons_diff = get_season_ordinal(current_season) - get_season_ordinal(season)
+    return get_season_weight_for_difference(seasons_diff)
+
+@lru_cache(maxsize=None)
+def get_season_weight_for_difference(seasons_diff):
+    """
+    Season weight for a season seasons_diff seasons before the current one
     
-    if current_year > season_year:
-        # Different years
-        full_years_diff = current_year - season_year
-        if current_type == 'f' and season_type == 's':
-            # Fall current, Spring past (within same calendar year)
-            seasons_diff = 2 * full_years_diff - 1
-        else:
-            seasons_diff = 2 * full_years_diff
-    elif current_year == season_year and current_type == 'f' and season_type == 's':
-        # Same year, Fall current, Spring past
-        seasons_diff = 1
+    Args:
+        seasons_diff (int): Difference of season ordinals; seasons after the
+            current one count as the current season
     
+    Returns:
+        float: Weight factor for the season
+    """
     # Apply weight decay (0.1 per season)
-    weight = max(0.1, 1.0 - (0.1 * seasons_diff))
-    return weight
+    return max(0.1, 1.0 - (0.1 * max(0, seasons_diff)))
 
 def get_k_factor(sailor):
     """
@@ -69,11 +92,18 @@ def get_k_factor(sailor):
     Returns:
         int: K-factor value
     """
-    from .models import Result
+    return get_k_factor_for_count(sailor.regatta_count)
+
+def get_k_factor_for_count(regatta_count):
+    """
+    Determine K-factor from the number of regattas a sailor has sailed
     
-    # Count total regattas the sailor has participated in
-    regatta_count = Result.objects.filter(sailor=sailor).values('regatta').distinct().count()
+    Args:
+        regatta_count (int): Number of regattas the sailor has participated in
     
+    Returns:
+        int: K-factor value
+    """
     if regatta_count < 3:
         return 24  # Reduced from 64 to 24 for new sailors
     elif regatta_count < 5:
@@ -119,11 +149,129 @@ def calculate_elo_change(sailor_elo, opponent_elo, sailor_place, opponent_place,
     
     return elo_change
 
+def calculate_division_elo_changes(ratings, places, k_factors, sailor_ids=None,
+                                   regatta_weight=1.0, division_weight=1.0, season_weight=1.0):
+    """
+    Calculate ELO changes for every result in a division at once
+    
+    Vectorized equivalent of calling calculate_elo_change for every pair of
+    results in the division and summing the changes for each result. The
+    expected-score matrix, the outcome matrix and the place weights are built
+    for the whole division in a single pass.
+    
+    Args:
+        ratings: ELO rating of the sailor on each result
+        places: Finishing place of each result
+        k_factors: K-factor of the sailor on each result
+        sailor_ids (optional): Sailor id of each result; results belonging to
+            the same sailor are not compared against each other
+        regatta_weight (float): Weight of the regatta type
+        division_weight (float): Weight of the division
+        season_weight (float): Weight of the season
+    
+    Returns:
+        numpy.ndarray: ELO change for each result, in input order
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    places = np.asarray(places, dtype=np.float64)
+    k_factors = np.asarray(k_factors, dtype=np.float64)
+    fleet_size = len(ratings)
+    
+    if fleet_size < 2:
+        return np.zeros(fleet_size)
+    
+    # expected[i, j] is the expected score of result i against result j
+    expected = 1.0 / (1.0 + 10 ** ((ratings[np.newaxis, :] - ratings[:, np.newaxis]) / 400.0))
+    
+    # outcome[i, j] is 1.0 for a win (lower place), 0.5 for a tie and 0.0 for a loss
+    outcome = 0.5 * (1.0 + np.sign(places[np.newaxis, :] - places[:, np.newaxis]))
+    
+    # Never compare a sailor against themselves
+    if sailor_ids is None:
+        opponents = ~np.eye(fleet_size, dtype=bool)
+    else:
+        sailor_ids = np.asarray(sailor_ids)
+        opponents = sailor_ids[:, np.newaxis] != sailor_ids[np.newaxis, :]
+    
+    score = np.where(opponents, outcome - expected, 0.0).sum(axis=1)
+    
+    # Same fleet size adjustment as calculate_elo_change
+    fleet_size_factor = max(5, fleet_size / 4)
+    place_weight = 1.0 / (1.0 + np.exp((places - 1) / fleet_size_factor))
+    
+    combined_weight = regatta_weight * division_weight * season_weight * place_weight
+    return k_factors * combined_weight * score
+
+def calculate_regatta_elo_changes(ratings, places, k_factors, sailors, divisions,
+                                  regatta_weight=1.0, season_weight=1.0):
+    """
+    Replay every division of one regatta in order
+    
+    Divisions are applied one after another, so a sailor entered in more
+    than one division carries the updated rating into the next one. Only
+    NumPy is used, so this can run in a worker process.
+    
+    Args:
+        ratings: Rating of each sailor entered in the regatta
+        places: Finishing place of each result
+        k_factors: K-factor of each sailor entered in the regatta
+        sailors: Index into ratings of the sailor on each result
+        divisions: (division, start, stop) result slices of each division
+        regatta_weight (float): Weight of the regatta type
+        season_weight (float): Weight of the season
+    
+    Returns:
+        tuple: (ratings after the regatta, ELO change per result)
+    """
+    ratings = np.array(ratings, dtype=np.float64)
+    changes = np.zeros(len(places))
+    
+    for division, start, stop in divisions:
+        # Skip if less than 2 sailors
+        if stop - start < 2:
+            continue
+        
+        division_sailors = sailors[start:stop]
+        division_changes = calculate_division_elo_changes(
+            ratings=ratings[division_sailors],
+            places=places[start:stop],
+            k_factors=k_factors[division_sailors],
+            sailor_ids=division_sailors,
+            regatta_weight=regatta_weight,
+            division_weight=1.2 if division == 'A' else 1.0,
+            season_weight=season_weight
+        )
+        
+        # Total the changes per sailor (a sailor may appear on more than one row)
+        entered, rows = np.unique(division_sailors, return_inverse=True)
+        totals = np.bincount(rows, weights=division_changes)
+        ratings[entered] += totals
+        changes[start:stop] = totals[rows]
+    
+    return ratings, changes
+
+def calculate_wave_elo_changes(tasks):
+    """
+    Replay a batch of regattas that share no sailor
+    
+    Process pool entry point for the in-memory replay. It lives here rather
+    than in sailors.replay because this module imports only NumPy at the
+    top, so a worker started with the spawn method can import it without
+    Django being set up.
+    
+    Args:
+        tasks: Argument tuples for calculate_regatta_elo_changes
+    
+    Returns:
+        list: calculate_regatta_elo_changes output for each task
+    """
+    return [calculate_regatta_elo_changes(*task) for task in tasks]
+
 def update_sailor_ratings(regatta):
     """
     Update ELO ratings for all sailors in a regatta
     """
-    from .models import Result, Sailor
+    from .models import Result, Sailor, RatingSnapshot
     
     # Get regatta info
     regatta_weight = regatta.regatta_type.weight
@@ -134,81 +282,135 @@ def update_sailor_ratings(regatta):
     # Get divisions in this regatta
     divisions = Result.objects.filter(regatta=regatta).values_list('division', flat=True).distinct()
     
+    # Remember ratings before the regatta for the rating snapshots
+    regatta_sailors = Sailor.objects.filter(result__regatta=regatta).distinct()
+    ratings_before = dict(regatta_sailors.values_list('id', 'elo_rating'))
+    
     # Process each division
     for division in divisions:
         # Get all results for this division
-        results = Result.objects.filter(regatta=regatta, division=division).select_related('sailor')
-        
-        # Count fleet size
-        fleet_size = results.count()
+        results = list(Result.objects.filter(regatta=regatta, division=division).select_related('sailor'))
         
         # Skip if less than 2 sailors
-        if fleet_size < 2:
+        if len(results) < 2:
             continue
         
         # Set division weight
         division_weight = 1.2 if division == 'A' else 1.0
         
-        # Calculate ELO changes for each sailor
-        elo_changes = {}  # Store changes to apply them all at once
+        # Get K-factor for each sailor once
+        k_factors = {}
+        for result in results:
+            if result.sailor_id not in k_factors:
+                k_factors[result.sailor_id] = get_k_factor(result.sailor)
+        
+        # Calculate ELO changes for the whole division
+        changes = calculate_division_elo_changes(
+            ratings=[result.sailor.elo_rating for result in results],
+            places=[result.place for result in results],
+            k_factors=[k_factors[result.sailor_id] for result in results],
+            sailor_ids=[result.sailor_id for result in results],
+            regatta_weight=regatta_weight,
+            division_weight=division_weight,
+            season_weight=season_weight
+        )
         
-        for sailor_result in results:
-            sailor = sailor_result.sailor
-            
-            if sailor.id not in elo_changes:
-                elo_changes[sailor.id] = 0
-            
-            # Get K-factor for this sailor
-            k_factor = get_k_factor(sailor)
-            
-            # Compare against every other sailor in division
-            for opponent_result in results:
-                if sailor_result.sailor.id == opponent_result.sailor.id:
-                    continue  # Skip self
-                
-                elo_change = calculate_elo_change(
-                    sailor_elo=sailor.elo_rating,
-                    opponent_elo=opponent_result.sailor.elo_rating,
-                    sailor_place=sailor_result.place,
-                    opponent_place=opponent_result.place,
-                    k_factor=k_factor,
-                    fleet_size=fleet_size,
-                    regatta_weight=regatta_weight,
-                    division_weight=division_weight,
-                    season_weight=season_weight
-                )
-                
-                elo_changes[sailor.id] += elo_change
+        # Total the changes per sailor (a sailor may appear on more than one row)
+        elo_changes = {}
+        sailors = {}
+        for result, change in zip(results, changes):
+            elo_changes[result.sailor_id] = elo_changes.get(result.sailor_id, 0) + float(change)
+            sailors.setdefault(result.sailor_id, result.sailor)
         
         # Apply all changes at once and store them
         for sailor_id, change in elo_changes.items():
-            sailor = Sailor.objects.get(id=sailor_id)
+            sailor = sailors[sailor_id]
             sailor.elo_rating += change
-            sailor.save()
-            
-            # Store the ELO change in the result
-            sailor_result = results.get(sailor_id=sailor_id)
-            sailor_result.elo_change = change
-            sailor_result.save()
+            sailor.save(update_fields=['elo_rating'])
+        
+        for result in results:
+            result.elo_change = elo_changes[result.sailor_id]
+            result.save(update_fields=['elo_change'])
+    
+    # Record each sailor's rating before and after the regatta
+    RatingSnapshot.objects.filter(regatta=regatta).delete()
+    RatingSnapshot.objects.bulk_create([
+        RatingSnapshot(
+            sailor_id=sailor_id,
+            regatta=regatta,
+            date=regatta.date,
+            rating_before=ratings_before[sailor_id],
+            rating_after=rating_after
+        )
+        for sailor_id, rating_after in regatta_sailors.values_list('id', 'elo_rating')
+    ])
 
-def apply_inactive_decay():
+def record_regatta_activity(regatta, sailor_ids):
+    """
+    Update activity counters for sailors entered in a regatta for the first time
+    
+    Args:
+        regatta: Regatta object
+        sailor_ids: Ids of sailors with no earlier results in this regatta
+    """
+    from django.db.models import F
+    from .models import Sailor
+    
+    if not sailor_ids:
+        return
+    
+    season = regatta.season
+    season_ordinal = get_season_ordinal(season)
+    sailors = list(Sailor.objects.filter(id__in=sailor_ids).only('id', 'first_season', 'last_season'))
+    
+    for sailor in sailors:
+        if not sailor.first_season or season_ordinal < get_season_ordinal(sailor.first_season):
+            sailor.first_season = season
+        if not sailor.last_season or season_ordinal > get_season_ordinal(sailor.last_season):
+            sailor.last_season = season
+    
+    Sailor.objects.filter(id__in=sailor_ids).update(regatta_count=F('regatta_count') + 1)
+    Sailor.objects.bulk_update(sailors, ['first_season', 'last_season'])
+
+def apply_inactive_decay(current_season=None):
     """
     Apply rating decay to inactive sailors
-    Should be run once per season
+    Should be run once per season; the decay ledger makes repeat runs in the
+    same season a no-op
+    
+    Args:
+        current_season (str, optional): Override for current season
+    
+    Returns:
+        int: Number of sailors decayed
     """
-    from .models import Sailor, Result
+    from django.db import transaction
+    from .models import DecayRun
     
-    current_season = get_current_season()
-    all_sailors = Sailor.objects.all()
-    
-    for sailor in all_sailors:
-        # Check if sailor competed in current season
-        competed_this_season = Result.objects.filter(
-            sailor=sailor,
-            regatta__season=current_season
-        ).exists()
+    if not current_season:
+        current_season = get_current_season()
+    
+    with transaction.atomic():
+        decay_run, created = DecayRun.objects.get_or_create(season=current_season)
+        if not created:
+            return 0
         
-        if not competed_this_season:
-            # Apply 3% decay for inactive sailors
-            sailor.elo_rating *= 0.97
-            sailor.save()
\ No newline at end of file
+        decay_run.sailors_affected = decay_inactive_sailors(current_season)
+        decay_run.save(update_fields=['sailors_affected'])
+    
+    return decay_run.sailors_affected
+
+def decay_inactive_sailors(current_season):
+    """
+    Decay every sailor who has not competed in the current season with a
+    single UPDATE, without touching the ledger
+    
+    Returns:
+        int: Number of sailors decayed
+    """
+    from django.db.models import F
+    from .models import Sailor
+    
+    return Sailor.objects.exclude(last_season=current_season).update(
+        elo_rating=F('elo_rating') * INACTIVE_DECAY
+    )
\ No newline at end of file
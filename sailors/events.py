@@ -0,0 +1,141 @@
+# sailors/events.py
+
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .models import ScrapeEvent
+
+# Events after which a job produces nothing more
+FINAL_EVENTS = ('done', 'failed')
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+
+# Feeds of this process, by job id
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+class JobFeed:
+    """
+    Single database poller for one job's events in this process
+
+    However many clients stream a job, the process polls ScrapeEvent for it
+    once per interval and fans new events out to every subscriber from
+    memory. The poller stops when the job finishes or the last subscriber
+    leaves.
+    """
+
+    def __init__(self, job_id, interval=None):
+        self.job_id = job_id
+        self.interval = interval if interval is not None else getattr(settings, 'SCRAPE_EVENT_POLL', 1.0)
+        self.events = []  # (id, event, data) in id order
+        self.finished = False
+        self.subscribers = 0
+        self.condition = threading.Condition()
+        self.async_waiters = set()  # (event loop, asyncio.Event)
+        self.thread = threading.Thread(target=self.poll, name=f'scrape-events-{job_id}', daemon=True)
+
+    def poll(self):
+        try:
+            while True:
+                last_id = self.events[-1][0] if self.events else 0
+                rows = list(
+                    ScrapeEvent.objects.filter(job_id=self.job_id, id__gt=last_id)
+                    .order_by('id').values_list('id', 'event', 'data')
+                )
+                with self.condition:
+                    self.events.extend(rows)
+                    if any(event in FINAL_EVENTS for _, event, _ in rows):
+                        self.finished = True
+                    stop = self.finished or self.subscribers == 0
+                    self.notify()
+                if stop:
+                    break
+                # Wait for the next poll unless the last subscriber leaves first
+                with self.condition:
+                    self.condition.wait_for(lambda: self.subscribers == 0, timeout=self.interval)
+        finally:
+            with _feeds_lock:
+                if _feeds.get(self.job_id) is self:
+                    del _feeds[self.job_id]
+            with self.condition:
+                self.finished = True
+                self.notify()
+            connection.close()
+
+    def notify(self):
+        """Wake every subscriber; call with the condition held"""
+        self.condition.notify_all()
+        for loop, waiter in list(self.async_waiters):
+            loop.call_soon_threadsafe(waiter.set)
+
+    async def wait_async(self, cursor, timeout):
+        """Wait until there are events after cursor, the feed ends or timeout, without holding a thread"""
+        waiter = asyncio.Event()
+        key = (asyncio.get_running_loop(), waiter)
+        with self.condition:
+            if len(self.events) > cursor or self.finished:
+                return
+            self.async_waiters.add(key)
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.condition:
+                self.async_waiters.discard(key)
+
+def subscribe(job_id):
+    """Join the job's feed, starting its poller if this is the first subscriber"""
+    with _feeds_lock:
+        feed = _feeds.get(job_id)
+        if feed is None or feed.finished:
+            feed = JobFeed(job_id)
+            _feeds[job_id] = feed
+            start = True
+        else:
+            start = False
+        with feed.condition:
+            feed.subscribers += 1
+    if start:
+        feed.thread.start()
+    return feed
+
+def unsubscribe(feed):
+    """Leave a feed; its poller stops once nobody is left"""
+    with feed.condition:
+        feed.subscribers -= 1
+        feed.condition.notify_all()
+
+def format_event(event_id, event, data):
+    """One Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+def new_events(feed, cursor):
+    with feed.condition:
+        return feed.events[cursor:], feed.finished
+
+async def stream_events_async(job_id, last_event_id=0):
+    """Server-Sent Events for a job, for ASGI servers"""
+    feed = subscribe(job_id)
+    try:
+        cursor = 0
+        while True:
+            events, finished = new_events(feed, cursor)
+            for event in events:
+                # Skip what a reconnecting client has already seen
+                if event[0] > last_event_id:
+                    yield format_event(*event)
+            cursor += len(events)
+            if finished and not events:
+                break
+            if not events:
+                await feed.wait_async(cursor, KEEPALIVE_SECONDS)
+                if not new_events(feed, cursor)[0] and not feed.finished:
+                    yield ": keepalive\n\n"
+    finally:
+        unsubscribe(feed)
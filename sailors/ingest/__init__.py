@@ -0,0 +1,17 @@
+# sailors/ingest/__init__.py
+"""
+Regatta ingestion, as stages connected by the engine in pipeline.py:
+
+    discover   list a season's regattas          discover.py
+    fetch      download sailors pages            fetch.py
+    parse      read dates and sailor entries     parse.py
+    normalize  settle date, type and entries     normalize.py
+    load       write regattas and results        load.py
+    rate       replay ratings once at the end    rate.py
+"""
+from .discover import get_regattas_in_season, parse_season_listing
+from .fetch import fetch_regatta_page, get_known_hashes, get_stored_hashes, hash_regatta_page
+from .load import load_regatta_results, save_regatta
+from .normalize import determine_regatta_type, normalize_regatta
+from .parse import extract_sailor_info, parse_regatta_date, parse_regatta_page, parse_regatta_sailors
+from .pipeline import IngestPipeline, ingest_season, ingest_seasons, scrape_regatta
@@ -0,0 +1,147 @@
+# sailors/ingest/discover.py
+"""
+Discover stage: list the regattas of a season from its listing page
+"""
+import requests
+from datetime import datetime
+from django.conf import settings
+
+from scraper import client
+from scraper.parsing import parse_html
+
+def get_regattas_in_season(season):
+    """
+    Get all regattas in a given season from the scoring site
+    
+    Args:
+        season (str): Season code (e.g., 'f23', 's24')
+    
+    Returns:
+        list: List of dictionaries with regatta name and URL
+    """
+    base_url = client.get_season_url(season)
+    
+    try:
+        response = client.get(base_url)
+        response.raise_for_status()
+        
+        # Save HTML for debugging, only when asked: the saved listings in the
+        # repository root are fixtures for benchmark_parsers and the stand-in
+        if getattr(settings, 'SCRAPE_DEBUG_HTML', False):
+            with open(f"{season}_debug.html", "w", encoding="utf-8") as f:
+                f.write(response.text)
+            print(f"Saved HTML to {season}_debug.html")
+        
+    except requests.exceptions.RequestException as e:
+        print(f"Error accessing season page: {e}")
+        return []
+    
+    # Every regatta link is inside a table
+    return parse_season_listing(parse_html(response.text, only='table'), base_url)
+
+# Season listing columns, by header text, and the descriptor keys they fill
+LISTING_COLUMNS = {
+    'Name': 'name',
+    'Host': 'host',
+    'Type': 'type',
+    'Scoring': 'scoring',
+    'Start date': 'date',
+    'Status': 'status',
+    'Leading': 'leading',
+}
+
+def parse_listing_date(text):
+    """Date from a season listing's MM/DD/YYYY start date, or None"""
+    try:
+        return datetime.strptime(text.strip(), "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+def parse_listing_row(row, columns, base_url):
+    """
+    Regatta descriptor from one row of a season listing
+    
+    Args:
+        row: BeautifulSoup tr element
+        columns (list): Descriptor key of each column, None for unknown ones
+        base_url (str): Season URL the regatta links are relative to
+    
+    Returns:
+        dict: Regatta name and URL plus every listed column, or None if the
+            row has no regatta link
+    """
+    link = row.find('a')
+    if not link or not link.get('href') or link['href'].startswith('/schools/'):
+        return None
+    
+    regatta = {
+        'name': link.text.strip(),
+        'url': base_url + link['href']
+    }
+    
+    for key, cell in zip(columns, row.find_all('td')):
+        if not key or key in regatta:
+            continue
+        if key == 'date':
+            regatta['date'] = parse_listing_date(cell.text)
+        elif key == 'leading':
+            # The leading school is shown as a logo named in the cell title
+            regatta['leading'] = cell.get('title', '') or cell.text.strip()
+        else:
+            regatta[key] = cell.text.strip()
+    
+    return regatta
+
+def parse_season_listing(soup, base_url, verbose=True):
+    """
+    Parse the regattas of a season listing page
+    
+    Args:
+        soup: BeautifulSoup of the season page
+        base_url (str): Season URL the regatta links are relative to
+        verbose (bool): Print how many regattas each selector found
+    
+    Returns:
+        list: Dictionaries with regatta name and URL, and where the listing
+            has them, host, type, scoring, start date, status and leading
+            school
+    """
+    # Map columns by their headers, in case the listing adds or moves one
+    headers = [th.text.strip() for th in soup.select("table thead th")]
+    columns = [LISTING_COLUMNS.get(header) for header in headers] or list(LISTING_COLUMNS.values())
+    
+    # Try multiple selector strategies
+    regattas = []
+    
+    # Strategy 1: Try the table.regatta-list selector
+    regatta_links = soup.select("table.regatta-list a")
+    if verbose:
+        print(f"Found {len(regatta_links)} links with table.regatta-list a selector")
+    
+    if regatta_links:
+        for link in regatta_links:
+            row = link.find_parent('tr')
+            regatta = parse_listing_row(row, columns, base_url) if row else None
+            if regatta is None:
+                regatta = {
+                    'name': link.text.strip(),
+                    'url': base_url + link['href']
+                }
+            regattas.append(regatta)
+    else:
+        # Strategy 2: Look for rows with class row0 or row1
+        rows = soup.select("tr.row0, tr.row1")
+        if verbose:
+            print(f"Found {len(rows)} rows with class row0 or row1")
+        
+        for row in rows:
+            regatta = parse_listing_row(row, columns, base_url)
+            if regatta:
+                regattas.append(regatta)
+        
+        if verbose:
+            print(f"Found {len(regattas)} links in those rows")
+    
+    if verbose:
+        print(f"Found {len(regattas)} total regattas")
+    return regattas
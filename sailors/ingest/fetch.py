@@ -0,0 +1,101 @@
+# sailors/ingest/fetch.py
+"""
+Fetch stage: download regatta sailors pages and spot unchanged ones
+
+Network only; safe to run in worker threads.
+"""
+import hashlib
+import re
+
+from scraper import client
+
+TABLE_PATTERN = re.compile(r'<table\b.*?</table>', re.IGNORECASE | re.DOTALL)
+DATETIME_PATTERN = re.compile(r'<time\b[^>]*\bdatetime="([^"]*)"', re.IGNORECASE)
+
+def hash_regatta_page(html):
+    """
+    Hash the parts of a regatta page the scrapers read
+
+    Only the tables and the regatta dates are hashed, with whitespace
+    collapsed, so page chrome such as navigation or generation timestamps
+    does not make an unchanged regatta look changed. No HTML tree is built.
+
+    Args:
+        html (str): Page HTML
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    tables = TABLE_PATTERN.findall(html)
+    content = ' '.join(' '.join(tables).split()) if tables else ' '.join(html.split())
+    dates = ','.join(DATETIME_PATTERN.findall(html))
+    return hashlib.sha256(f"{dates}|{content}".encode('utf-8')).hexdigest()
+
+def get_stored_hashes(seasons):
+    """
+    Content hashes saved for the regattas of some seasons, in one query
+
+    Args:
+        seasons (list): Season codes
+
+    Returns:
+        dict: Map of regatta URL to (season, name, content hash)
+    """
+    from ..models import Regatta
+
+    stored = Regatta.objects.filter(season__in=seasons).exclude(content_hash='').values_list(
+        'url', 'season', 'name', 'content_hash'
+    )
+    return {url: (season, name, content_hash) for url, season, name, content_hash in stored}
+
+def get_known_hashes(regattas, season, stored=None):
+    """
+    Stored content hashes of regattas whose listing details are unchanged
+
+    Args:
+        regattas: Dictionaries with regatta 'url' and 'name'
+        season (str): Season code the regattas are listed in
+        stored (dict, optional): Result of get_stored_hashes covering the
+            season; queried when not given
+
+    Returns:
+        dict: Map of regatta URL to its stored content hash
+    """
+    if stored is None:
+        stored = get_stored_hashes([season])
+
+    known = {}
+    for regatta in regattas:
+        stored_season, name, content_hash = stored.get(regatta['url'], (None, None, None))
+        if stored_season == season and name == regatta['name']:
+            known[regatta['url']] = content_hash
+    return known
+
+def fetch_regatta_page(regatta_url, known_hash=None):
+    """
+    Download a regatta sailors page
+
+    Args:
+        regatta_url (str): Regatta URL
+        known_hash (str, optional): Content hash saved for this regatta
+
+    Returns:
+        dict: Page 'html', its 'content_hash' and whether it is 'unchanged'
+            from known_hash
+
+    Raises:
+        requests.RequestException: If the page could not be fetched
+    """
+    sailors_url = regatta_url + "/sailors"
+    print(f"Fetching: {sailors_url}")
+
+    response = client.get(sailors_url)
+    response.raise_for_status()
+
+    # Unchanged pages are not parsed at all
+    content_hash = hash_regatta_page(response.text)
+    return {
+        'html': response.text,
+        'content_hash': content_hash,
+        'unchanged': bool(known_hash) and content_hash == known_hash,
+    }
@@ -0,0 +1,202 @@
+# sailors/ingest/load.py
+"""
+Load stage: write normalized regattas and their results to the database
+
+Runs on the thread that drives the pipeline, so every write shares one
+connection.
+"""
+from django.db import transaction
+
+from ..elo import record_regatta_activity
+from ..models import School, Sailor, Result, Regatta, RegattaType, PendingRatingUpdate
+
+def get_school_ids(names):
+    """
+    Map school names to ids, creating missing schools in one insert
+
+    Returns:
+        tuple: (map of name to id, number of schools created)
+    """
+    school_ids = dict(School.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = set(names) - set(school_ids)
+    if missing:
+        School.objects.bulk_create([School(name=name) for name in missing], ignore_conflicts=True)
+        school_ids = dict(School.objects.filter(name__in=names).values_list('name', 'id'))
+    return school_ids, len(missing)
+
+def get_sailor_ids(keys):
+    """
+    Map (sailor name, school id) pairs to sailor ids, creating missing
+    sailors in one insert
+
+    Returns:
+        tuple: (map of (name, school id) to id, number of sailors created)
+    """
+    def lookup():
+        sailors = Sailor.objects.filter(
+            name__in={name for name, _ in keys},
+            school_id__in={school_id for _, school_id in keys},
+        ).values_list('name', 'school_id', 'id')
+        return {(name, school_id): sailor_id for name, school_id, sailor_id in sailors if (name, school_id) in keys}
+
+    sailor_ids = lookup()
+    missing = set(keys) - set(sailor_ids)
+    if missing:
+        sailors = [Sailor(name=name, school_id=school_id, elo_rating=1000) for name, school_id in missing]
+        # bulk_create skips save(), so fill the split name columns here
+        for sailor in sailors:
+            sailor.set_name_columns()
+        Sailor.objects.bulk_create(sailors, ignore_conflicts=True)
+        created = len(missing)
+        sailor_ids = lookup()
+    else:
+        created = 0
+    return sailor_ids, created
+
+def load_regatta_results(regatta, entries):
+    """
+    Write every parsed result of a regatta in a handful of statements
+
+    Schools and sailors are resolved through maps built from one query each,
+    new rows are inserted with bulk_create and changed places are updated
+    with bulk_update, all in one transaction. Activity counters are updated
+    for sailors entered in the regatta for the first time.
+
+    Args:
+        regatta: Regatta the results belong to
+        entries: Dictionaries with school, name, division, position and place;
+            a later entry for the same sailor, division and position wins
+
+    Returns:
+        dict: Numbers of sailors added, results added and results updated
+    """
+    stats = {'sailors_added': 0, 'results_added': 0, 'results_updated': 0}
+    if not entries:
+        return stats
+
+    with transaction.atomic():
+        school_ids, _ = get_school_ids({entry['school'] for entry in entries})
+        sailor_ids, stats['sailors_added'] = get_sailor_ids(
+            {(entry['name'], school_ids[entry['school']]) for entry in entries}
+        )
+
+        # Place of every result on the page, keyed like the unique constraint
+        places = {}
+        for entry in entries:
+            sailor_id = sailor_ids[(entry['name'], school_ids[entry['school']])]
+            places[(sailor_id, entry['division'], entry['position'])] = int(entry['place'])
+
+        existing = {
+            (result.sailor_id, result.division, result.position): result
+            for result in Result.objects.filter(regatta=regatta).only('id', 'sailor_id', 'division', 'position', 'place')
+        }
+        existing_sailor_ids = {sailor_id for sailor_id, _, _ in existing}
+
+        new_results = []
+        changed_results = []
+        for (sailor_id, division, position), place in places.items():
+            result = existing.get((sailor_id, division, position))
+            if result is None:
+                new_results.append(Result(
+                    sailor_id=sailor_id,
+                    regatta=regatta,
+                    division=division,
+                    position=position,
+                    place=place
+                ))
+            elif result.place != place:
+                result.place = place
+                changed_results.append(result)
+
+        Result.objects.bulk_create(new_results, ignore_conflicts=True)
+        Result.objects.bulk_update(changed_results, ['place'])
+        stats['results_added'] = len(new_results)
+        stats['results_updated'] = len(changed_results)
+
+        # Update activity counters for sailors entered in this regatta for the first time
+        record_regatta_activity(regatta, {result.sailor_id for result in new_results} - existing_sailor_ids)
+
+    return stats
+
+def save_regatta(page):
+    """
+    Write a normalized regatta and its results to the database in one
+    transaction
+    
+    Args:
+        page (dict): Regatta record from normalize_regatta
+    
+    Returns:
+        dict: Sailors and results added, and the earliest date whose ratings
+            this regatta can affect
+    """
+    regatta_url = page['url']
+    regatta_name = page['name']
+    regatta_date = page['date']
+    season = page['season']
+    regatta_type_name = page['regatta_type']
+    is_jv = page['is_jv']
+    
+    with transaction.atomic():
+        # Get or create regatta type
+        regatta_type, _ = RegattaType.objects.get_or_create(
+            name=regatta_type_name,
+            defaults={'weight': 1.0}
+        )
+        
+        # Check if this regatta already exists
+        existing_regatta = Regatta.objects.filter(url=regatta_url).first()
+        previous_date = existing_regatta.date if existing_regatta else None
+        
+        if existing_regatta:
+            # Regatta already exists, just update fields if needed
+            if (existing_regatta.name != regatta_name or 
+                existing_regatta.date != regatta_date or
+                existing_regatta.season != season or
+                existing_regatta.regatta_type_id != regatta_type.id or
+                existing_regatta.is_jv != is_jv):
+                
+                existing_regatta.name = regatta_name
+                existing_regatta.date = regatta_date
+                existing_regatta.season = season
+                existing_regatta.regatta_type = regatta_type
+                existing_regatta.is_jv = is_jv
+                existing_regatta.save()
+                print(f"Updated regatta: {regatta_name}")
+            else:
+                print(f"Regatta already exists and is up to date: {regatta_name}")
+            
+            regatta = existing_regatta
+        else:
+            # Create new regatta
+            regatta = Regatta.objects.create(
+                name=regatta_name,
+                url=regatta_url,
+                date=regatta_date,
+                season=season,
+                regatta_type=regatta_type,
+                is_jv=is_jv
+            )
+            print(f"Created new regatta: {regatta_name}")
+        
+        # Write every result in bulk; activity counters are updated with them
+        loaded = load_regatta_results(regatta, page['entries'])
+        if loaded['results_updated']:
+            print(f"Updated {loaded['results_updated']} results for {regatta_name}")
+        
+        # Earliest date whose ratings this regatta can affect
+        rating_date = min(regatta_date, previous_date) if previous_date else regatta_date
+        
+        # Only remember the page once every row is saved. The pending rating
+        # date commits with it, so a page that is skipped as unchanged next
+        # time still gets its ratings replayed if this run's replay fails
+        if page.get('content_hash'):
+            Regatta.objects.filter(pk=regatta.pk).update(content_hash=page['content_hash'])
+        PendingRatingUpdate.objects.get_or_create(date=rating_date)
+    
+    # Ratings are recalculated by the caller from the earliest affected date
+    return {
+        'sailors_added': loaded['sailors_added'],
+        'results_added': loaded['results_added'],
+        'rating_date': rating_date
+    }
@@ -0,0 +1,78 @@
+# sailors/ingest/normalize.py
+"""
+Normalize stage: turn a parsed regatta into the record the load stage writes
+
+Settles the date, type and JV flag of the regatta and cleans its entries.
+No network or database access.
+"""
+
+def determine_regatta_type(name, description=""):
+    """
+    Determine regatta type based on name and description
+    """
+    name_lower = name.lower()
+    desc_lower = description.lower() if description else ""
+    
+    if "national championship" in name_lower or "national championship" in desc_lower:
+        return "National Championship"
+    elif "national" in name_lower and "invitational" in name_lower:
+        return "National Invitational"
+    elif "district championship" in name_lower:
+        return "District Championship"
+    elif "district" in name_lower and "qualifier" in name_lower:
+        return "District Championship Qualifier"
+    elif "district" in name_lower:
+        return "In-District"
+    elif "state championship" in name_lower:
+        return "State Championship"
+    elif "league championship" in name_lower:
+        return "League Championship"
+    elif "league" in name_lower:
+        return "In League"
+    elif "jv" in name_lower:
+        return "JV"
+    else:
+        return "Promotional"
+
+def normalize_regatta(regatta, parsed, content_hash):
+    """
+    Build the page record for a parsed regatta
+    
+    Args:
+        regatta (dict): Descriptor from the discover stage, with 'season'
+        parsed (dict): Page date and entries from the parse stage
+        content_hash (str): Hash of the fetched page
+    
+    Returns:
+        dict: Regatta url, name, season, date, type name, JV flag, content
+            hash and entries with integer places; a later entry for the same
+            sailor, division and position wins
+    
+    Raises:
+        ValueError: If the regatta has no date, or a place is not a number
+    """
+    # Take the date from the sailors page, or else from the season listing
+    regatta_date = parsed['date'] or regatta.get('date')
+    if not regatta_date:
+        # A guessed date would put the regatta out of order in rating replays
+        raise ValueError(f"No date found for regatta {regatta['name']}")
+    
+    entries = {}
+    for entry in parsed['entries']:
+        try:
+            place = int(entry['place'])
+        except ValueError:
+            raise ValueError(f"Invalid place {entry['place']!r} for {entry['name']} in {regatta['name']}")
+        entries[(entry['school'], entry['name'], entry['division'], entry['position'])] = dict(entry, place=place)
+    
+    return {
+        'url': regatta['url'],
+        'name': regatta['name'],
+        'season': regatta['season'],
+        'date': regatta_date,
+        'regatta_type': determine_regatta_type(regatta['name']),
+        'is_jv': "jv" in regatta['name'].lower(),
+        'content_hash': content_hash,
+        'unchanged': False,
+        'entries': list(entries.values()),
+    }
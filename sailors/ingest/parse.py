@@ -0,0 +1,207 @@
+# sailors/ingest/parse.py
+"""
+Parse stage: read the date and sailor entries out of a regatta sailors page
+
+Pure functions of the page HTML, safe to run in worker threads.
+"""
+import re
+from datetime import datetime
+
+from scraper.parsing import parse_html
+
+def parse_regatta_page(html):
+    """
+    Parse a regatta sailors page
+    
+    Args:
+        html (str): Sailors page HTML
+    
+    Returns:
+        dict: 'date' from the page, or None if it has none, and the sailor
+            'entries'
+    """
+    # Only the results table and the date are read
+    soup = parse_html(html, only=['table', 'time'])
+    return {
+        'date': parse_regatta_date(soup),
+        'entries': parse_regatta_sailors(soup),
+    }
+
+def extract_sailor_info(td_element):
+    """Extract sailor name and graduation year from a td element"""
+    if not td_element:
+        return None, None
+        
+    # Find the <a> tag in the td
+    a_tag = td_element.find('a')
+    if not a_tag:
+        return None, None
+        
+    # Skip links to schools
+    if '/schools/' in a_tag.get('href', ''):
+        return None, None
+        
+    text = a_tag.text.strip()
+    if not text:
+        return None, None
+    
+    # Special case for "Reserves"
+    if text == "Reserves":
+        return "Reserves", "N/A"
+    
+    # Try to match the pattern "Name 'YY" or "Name 'YY*"
+    name_match = re.search(r'(.+?)\s+\'(\d+)(\*?)', text)
+    if name_match:
+        sailor_name = name_match.group(1).strip()
+        grad_year = "'" + name_match.group(2)
+        if name_match.group(3):  # If there's an asterisk
+            grad_year += "*"
+        return sailor_name, grad_year
+    
+    # If no match found, return the text as the name
+    return text, None
+
+def parse_regatta_date(soup):
+    """Regatta date from the first time element of a regatta page, or None"""
+    time_element = soup.select_one("time[datetime]")
+    if time_element and time_element.get('datetime'):
+        # Extract the datetime attribute which has the format YYYY-MM-DDThh:mm
+        datetime_str = time_element.get('datetime')
+        # Parse just the date part (YYYY-MM-DD)
+        date_part = datetime_str.split('T')[0]
+        return datetime.strptime(date_part, "%Y-%m-%d").date()
+    return None
+
+def parse_regatta_sailors(soup):
+    """
+    Parse the sailor table of a regatta sailors page
+    
+    Args:
+        soup: BeautifulSoup of the sailors page
+    
+    Returns:
+        list: Dictionaries with school, division, place, position and the
+            sailor name including the graduation year
+    """
+    entries = []
+    
+    # Find the sailor table
+    table = soup.find('table')
+    if not table:
+        return entries
+    
+    # Get tbody which contains all rows
+    tbody = table.find('tbody')
+    if not tbody:
+        return entries
+    
+    # Get all rows
+    rows = tbody.find_all('tr')
+    
+    current_school = None
+    current_division = None
+    current_place = None
+    
+    # Process rows
+    for row in rows:
+        # Skip rows without class
+        if not row.get('class'):
+            continue
+        
+        # Skip rows with 'reserves-row' class
+        row_classes = ' '.join(row.get('class', []))
+        if 'reserves-row' in row_classes:
+            continue
+            
+        # Get all cells in the row
+        cells = row.find_all('td')
+        if not cells:
+            continue
+            
+        # Check if this is a topborder row (first type)
+        is_topborder = 'topborder' in row_classes
+        
+        # If this is a topborder row, update the school
+        if is_topborder:
+            for cell in cells:
+                if cell.get('class') and 'schoolname' in cell.get('class'):
+                    current_school = cell.text.strip()
+        
+        # Skip if we don't have a current school
+        if not current_school:
+            continue
+        
+        # Check for division and place cells
+        has_division_cell = False
+        has_rank_cell = False
+        row_division = None
+        row_place = None
+        
+        for cell in cells:
+            cell_classes = cell.get('class', [])
+            if cell_classes:
+                if 'division-cell' in cell_classes:
+                    has_division_cell = True
+                    row_division = cell.text.strip()
+                elif 'rank-cell' in cell_classes:
+                    has_rank_cell = True
+                    row_place = cell.text.strip()
+        
+        # Update division and place if found
+        if row_division and row_place:
+            current_division = row_division
+            current_place = row_place
+        
+        # Skip row if we don't have division or place info yet
+        if not current_division or not current_place:
+            continue
+        
+        # Determine row type
+        is_type1 = is_topborder
+        is_type2 = not is_topborder and has_division_cell and has_rank_cell
+        is_type3 = not is_topborder and not has_division_cell and not has_rank_cell
+        
+        # Extract sailor information based on row type
+        skipper_cell = None
+        crew_cell = None
+        
+        # Type 1: topborder row with skipper in position 5, crew in position 7
+        if is_type1 and len(cells) >= 7:
+            skipper_cell = cells[4]  # position 5 (0-indexed)
+            crew_cell = cells[6] if len(cells) > 6 else None  # position 7 (0-indexed)
+            
+        # Type 2: Regular row with skipper in position 3, crew in position 5
+        elif is_type2 and len(cells) >= 5:
+            skipper_cell = cells[2]  # position 3 (0-indexed)
+            crew_cell = cells[4] if len(cells) > 4 else None  # position 5 (0-indexed)
+            
+        # Type 3: Row without division-cell or rank-cell
+        elif is_type3:
+            # Check if first or third cell has a sailor link
+            if len(cells) >= 1:
+                # Always check position 1 (index 0) for skipper
+                if cells[0].find('a') and '/sailors/' in cells[0].find('a').get('href', ''):
+                    skipper_cell = cells[0]
+                
+                # Check position 3 (index 2) for crew if it exists
+                if len(cells) >= 3 and cells[2].find('a') and '/sailors/' in cells[2].find('a').get('href', ''):
+                    crew_cell = cells[2]
+        
+        for position, cell in [('Skipper', skipper_cell), ('Crew', crew_cell)]:
+            if not cell:
+                continue
+            
+            sailor_name, grad_year = extract_sailor_info(cell)
+            if not sailor_name:
+                continue
+            
+            entries.append({
+                'school': current_school,
+                'division': current_division,
+                'place': current_place,
+                'position': position,
+                # Store the name with the graduation year in "Name 'YY" format
+                'name': f"{sailor_name} {grad_year}" if grad_year else sailor_name,
+            })
+    
+    return entries
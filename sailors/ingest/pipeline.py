@@ -0,0 +1,413 @@
+# sailors/ingest/pipeline.py
+"""
+The ingestion engine
+
+    discover -> fetch -> parse -> normalize -> load -> rate
+
+Discover, fetch, parse and normalize run in background threads connected
+by bounded queues, so several seasons are listed at once, later pages
+download while earlier ones are parsed and
+written, and a slow stage holds back the ones feeding it instead of letting
+pages pile up in memory. Load and rate run on the calling thread, which also
+receives every progress event, so the database is only used from there.
+"""
+import queue
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.db import transaction
+
+from .discover import get_regattas_in_season
+from .fetch import fetch_regatta_page, get_known_hashes, get_stored_hashes
+from .load import save_regatta
+from .normalize import normalize_regatta
+from .parse import parse_regatta_page
+from .rate import update_ratings
+
+STAGES = ['discover', 'fetch', 'parse', 'normalize', 'load', 'rate']
+
+SEASON_PATTERN = re.compile(r'^[fs]\d{2}$')
+
+# Marks the end of a stage's input
+STOP = object()
+
+class Stopped(Exception):
+    """Raised in stage threads when the pipeline shuts down early"""
+
+class IngestPipeline:
+    """
+    Ingest every regatta of one or more seasons
+
+    Args:
+        seasons (list): Season codes to ingest, e.g. ['f23', 's24']
+        progress (callable, optional): Called on the calling thread as
+            progress(event, **data) for 'listed', 'fetched', 'parsed',
+            'skipped', 'saved', 'ratings' and 'error' events; 'skipped',
+            'saved' and regatta 'error' events carry its url and season
+        fetch_workers (int, optional): Pages downloaded at once, defaults to
+            settings.SCRAPE_MAX_WORKERS
+        parse_workers (int, optional): Pages parsed at once, defaults to
+            settings.SCRAPE_PARSE_WORKERS
+        queue_size (int, optional): Items a queue holds before the stage
+            feeding it waits, defaults to settings.SCRAPE_QUEUE_SIZE
+        season_workers (int, optional): Seasons listed at once, defaults to
+            settings.SCRAPE_SEASON_WORKERS
+        limit (int, optional): Regattas to ingest per season, for trial runs
+        rate (bool): Replay ratings once everything is loaded
+        skip (iterable, optional): Regatta URLs to leave out, e.g. ones an
+            interrupted run already finished
+
+    After run, timings holds the seconds each item spent in each stage.
+    """
+
+    def __init__(self, seasons, progress=None, fetch_workers=None, parse_workers=None,
+                 queue_size=None, season_workers=None, limit=None, rate=True, skip=None):
+        for season in seasons:
+            if not SEASON_PATTERN.match(season):
+                raise ValueError(f"Invalid season {season!r}. Use 'f' or 's' followed by two digits (e.g., 'f23')")
+
+        self.seasons = list(seasons)
+        self.progress = progress
+        self.limit = limit
+        self.rate = rate
+        self.skip = set(skip or ())
+        self.season_workers = max(1, min(len(self.seasons), season_workers or getattr(settings, 'SCRAPE_SEASON_WORKERS', 2)))
+        self.fetch_workers = max(1, fetch_workers or getattr(settings, 'SCRAPE_MAX_WORKERS', 8))
+        self.parse_workers = max(1, parse_workers or getattr(settings, 'SCRAPE_PARSE_WORKERS', 2))
+        queue_size = queue_size or getattr(settings, 'SCRAPE_QUEUE_SIZE', 32)
+
+        # Holds only the season codes, so it needs no bound
+        self.season_queue = queue.Queue()
+        self.fetch_queue = queue.Queue(queue_size)
+        self.parse_queue = queue.Queue(queue_size)
+        self.normalize_queue = queue.Queue(queue_size)
+        self.output = queue.Queue(queue_size)
+
+        self.timings = {stage: [] for stage in STAGES}
+        self.results = {
+            'regattas_listed': 0,
+            'regattas_scraped': 0,
+            'regattas_changed': 0,
+            'regattas_skipped': 0,
+            'regattas_resumed': 0,
+            'sailors_added': 0,
+            'results_added': 0,
+            'errors': []
+        }
+        self.rating_date = None
+        self.stored_hashes = {}
+
+        # Threads still running in each stage, so the last one out can stop the next
+        self._running = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def report(self, event, **data):
+        if self.progress:
+            self.progress(event, **data)
+
+    def put(self, target, item):
+        """Put onto a bounded queue, giving up if the pipeline is stopping"""
+        while not self._stopping.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+        raise Stopped()
+
+    def get(self, source):
+        """Take from a queue, giving up if the pipeline is stopping"""
+        while not self._stopping.is_set():
+            try:
+                return source.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        raise Stopped()
+
+    def finish(self, stage, next_queue, next_workers):
+        """Called as each thread of a stage exits; the last one stops the next stage"""
+        with self._lock:
+            self._running[stage] -= 1
+            last = self._running[stage] == 0
+        if last:
+            try:
+                for _ in range(next_workers):
+                    self.put(next_queue, STOP)
+            except Stopped:
+                pass
+
+    # Stage handlers, each returning (events, results for the next stage)
+
+    def discover_one(self, season):
+        regattas = get_regattas_in_season(season)
+        if self.limit:
+            regattas = regattas[:self.limit]
+        known_hashes = get_known_hashes(regattas, season, self.stored_hashes)
+
+        tasks = [
+            (dict(regatta, season=season), known_hashes.get(regatta['url']))
+            for regatta in regattas
+            if regatta['url'] not in self.skip
+        ]
+        events = [('listed', {'season': season, 'count': len(regattas), 'resumed': len(regattas) - len(tasks)})]
+        if not regattas:
+            events.append(('error', {'message': f"No regattas found for season {season}"}))
+        return events, tasks
+
+    def fetch_one(self, task):
+        regatta, known_hash = task
+        try:
+            fetched = fetch_regatta_page(regatta['url'], known_hash)
+        except requests.exceptions.RequestException as e:
+            return [('error', {'regatta': regatta, 'message': f"Error accessing sailors page for {regatta['name']}: {e}"})], []
+
+        if fetched['unchanged']:
+            print(f"Regatta unchanged since last scrape: {regatta['name']}")
+            return [('skipped', {'regatta': regatta})], []
+        return [('fetched', {'regatta': regatta})], [(regatta, fetched)]
+
+    def parse_one(self, task):
+        regatta, fetched = task
+        try:
+            parsed = parse_regatta_page(fetched['html'])
+        except Exception as e:
+            return [('error', {'regatta': regatta, 'message': f"Error parsing regatta {regatta['name']}: {e}"})], []
+        return [('parsed', {'regatta': regatta, 'rows': len(parsed['entries'])})], [(regatta, parsed, fetched['content_hash'])]
+
+    def normalize_one(self, task):
+        regatta, parsed, content_hash = task
+        try:
+            page = normalize_regatta(regatta, parsed, content_hash)
+        except ValueError as e:
+            return [('error', {'regatta': regatta, 'message': f"Error processing regatta {regatta['name']}: {e}"})], []
+        return [('page', {'regatta': regatta, 'page': page})], []
+
+    def worker(self, stage, source, handle, next_queue, next_workers):
+        """
+        Run one thread of a stage: take items from source, handle them, and
+        pass events to the calling thread and results to the next stage
+        """
+        try:
+            while True:
+                item = self.get(source)
+                if item is STOP:
+                    break
+
+                started = time.perf_counter()
+                try:
+                    events, results = handle(item)
+                except Exception as e:
+                    # Keep the thread alive for the rest of the stage's input
+                    events, results = [('error', {'message': f"Error in {stage} stage: {e}"})], []
+                self.timings[stage].append(time.perf_counter() - started)
+
+                for event in events:
+                    self.put(self.output, event)
+                for result in results:
+                    self.put(next_queue, result)
+        except Stopped:
+            pass
+        finally:
+            self.finish(stage, next_queue, next_workers)
+
+    # Calling thread
+
+    def handle(self, event, data):
+        """Act on an event from the stage threads"""
+        results = self.results
+        regatta = data.get('regatta')
+
+        if event == 'listed':
+            results['regattas_listed'] += data['count']
+            results['regattas_resumed'] += data['resumed']
+            self.report('listed', total=results['regattas_listed'], season=data['season'], resumed=data['resumed'])
+        elif event == 'skipped':
+            results['regattas_scraped'] += 1
+            results['regattas_skipped'] += 1
+            self.report('skipped', regatta=regatta['name'], url=regatta['url'], season=regatta['season'])
+        elif event == 'fetched':
+            self.report('fetched', regatta=regatta['name'])
+        elif event == 'parsed':
+            self.report('parsed', regatta=regatta['name'], rows=data['rows'])
+        elif event == 'error':
+            print(data['message'])
+            results['errors'].append(data['message'])
+            if regatta:
+                self.report(
+                    'error',
+                    regatta=regatta['name'],
+                    url=regatta['url'],
+                    season=regatta['season'],
+                    message=data['message']
+                )
+            else:
+                self.report('error', message=data['message'])
+        elif event == 'page':
+            self.load(data['page'])
+
+    def load(self, page):
+        """
+        Load stage: write one regatta
+
+        The 'saved' event is reported inside the regatta's transaction, so
+        anything the progress callback records about it commits with it.
+        """
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                saved = save_regatta(page)
+                self.report(
+                    'saved',
+                    regatta=page['name'],
+                    url=page['url'],
+                    season=page['season'],
+                    rows=len(page['entries']),
+                    sailors_added=saved['sailors_added'],
+                    rating_date=saved['rating_date'].isoformat()
+                )
+        except Exception as e:
+            self.handle('error', {'regatta': page, 'message': f"Error processing regatta {page['name']}: {e}"})
+            return
+        finally:
+            self.timings['load'].append(time.perf_counter() - started)
+
+        self.results['regattas_scraped'] += 1
+        self.results['regattas_changed'] += 1
+        self.results['sailors_added'] += saved['sailors_added']
+        self.results['results_added'] += saved['results_added']
+        if self.rating_date is None or saved['rating_date'] < self.rating_date:
+            self.rating_date = saved['rating_date']
+
+    def update_ratings(self):
+        """
+        Rate stage: replay ratings once from the earliest loaded regatta, or
+        from an earlier date a previous run loaded but failed to replay
+        """
+        started = time.perf_counter()
+        try:
+            since = update_ratings(self.rating_date)
+            if since:
+                self.report('ratings', since=since.isoformat())
+        except Exception as e:
+            self.handle('error', {'message': f"Error updating ELO ratings: {e}"})
+        finally:
+            self.timings['rate'].append(time.perf_counter() - started)
+
+    def run(self):
+        """
+        Run every stage to completion
+
+        Returns:
+            dict: Regattas listed, scraped, changed, skipped and resumed,
+                sailors and results added and errors
+        """
+        stages = [
+            ('discover', self.season_workers, self.season_queue, self.discover_one, self.fetch_queue, self.fetch_workers),
+            ('fetch', self.fetch_workers, self.fetch_queue, self.fetch_one, self.parse_queue, self.parse_workers),
+            ('parse', self.parse_workers, self.parse_queue, self.parse_one, self.normalize_queue, 1),
+            ('normalize', 1, self.normalize_queue, self.normalize_one, self.output, 1),
+        ]
+
+        # Stage threads never touch the database; what discover needs is read here
+        self.stored_hashes = get_stored_hashes(self.seasons)
+
+        for season in self.seasons:
+            self.season_queue.put(season)
+        for _ in range(self.season_workers):
+            self.season_queue.put(STOP)
+
+        self._running = {}
+        threads = []
+        for stage, count, source, handle, next_queue, next_workers in stages:
+            self._running[stage] = count
+            threads += [
+                threading.Thread(
+                    target=self.worker,
+                    args=(stage, source, handle, next_queue, next_workers),
+                    name=f'ingest-{stage}-{i}',
+                    daemon=True
+                )
+                for i in range(count)
+            ]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                message = self.get(self.output)
+                if message is STOP:
+                    break
+                self.handle(*message)
+        except BaseException:
+            # Let the stage threads wind down instead of waiting on full queues
+            self._stopping.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        # Runs even when nothing changed, to retry a replay an earlier run left pending
+        if self.rate:
+            self.update_ratings()
+
+        print(f"Regattas changed: {self.results['regattas_changed']}, unchanged: {self.results['regattas_skipped']}")
+        return self.results
+
+def ingest_seasons(seasons, progress=None, **options):
+    """
+    Ingest every regatta of several seasons and update ratings once
+
+    Args:
+        seasons (list): Season codes (e.g., ['f23', 's24'])
+        progress (callable, optional): See IngestPipeline
+        **options: Passed to IngestPipeline
+
+    Returns:
+        dict: Regattas listed, scraped, changed and skipped, sailors and
+            results added and errors
+    """
+    return IngestPipeline(seasons, progress=progress, **options).run()
+
+def ingest_season(season, progress=None, **options):
+    """
+    Ingest every regatta of a season and update ratings once at the end
+
+    Args:
+        season (str): Season code (e.g., 'f23', 's24')
+        progress (callable, optional): See IngestPipeline
+        **options: Passed to IngestPipeline
+
+    Returns:
+        dict: Regattas scraped, changed and skipped, sailors and results
+            added and per-regatta errors
+    """
+    results = ingest_seasons([season], progress=progress, **options)
+    if not results['regattas_listed']:
+        raise Exception(f"No regattas found for season {season}")
+    return results
+
+def scrape_regatta(regatta_url, regatta_name, season, listed_date=None):
+    """
+    Ingest a single regatta, running each stage inline
+
+    Ratings are not updated; the caller replays them from the returned
+    rating_date.
+
+    Returns:
+        dict: Sailors and results added, and the earliest date whose ratings
+            this regatta can affect
+    """
+    regatta = {'url': regatta_url, 'name': regatta_name, 'season': season, 'date': listed_date}
+    try:
+        fetched = fetch_regatta_page(regatta_url)
+    except requests.exceptions.RequestException as e:
+        print(f"Error accessing sailors page: {e}")
+        return {'sailors_added': 0, 'results_added': 0}
+
+    page = normalize_regatta(regatta, parse_regatta_page(fetched['html']), fetched['content_hash'])
+    return save_regatta(page)
@@ -0,0 +1,34 @@
+# sailors/ingest/rate.py
+"""
+Rate stage: replay ratings once every regatta of a run is loaded
+"""
+
+def update_ratings(since=None):
+    """
+    Replay ratings from the earliest date any loaded regatta affects
+    
+    Every load records the date it affects as a PendingRatingUpdate in the
+    regatta's transaction. Those records are cleared only once a replay
+    covering them succeeds, so a replay that fails is picked up again by
+    the next one, even if every page is unchanged by then.
+    
+    Args:
+        since (date, optional): Earliest affected date; pending dates
+            earlier than it are included too
+    
+    Returns:
+        date: Date ratings were replayed from, or None if nothing was pending
+    """
+    from ..models import PendingRatingUpdate
+    from ..replay import recalculate_from
+    
+    pending = dict(PendingRatingUpdate.objects.values_list('id', 'date'))
+    dates = list(pending.values()) + ([since] if since else [])
+    if not dates:
+        return None
+    
+    since = min(dates)
+    recalculate_from(since)
+    PendingRatingUpdate.objects.filter(id__in=list(pending)).delete()
+    print(f"Updated ELO ratings from {since}")
+    return since
@@ -0,0 +1,182 @@
+# sailors/jobs.py
+
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ScrapeJob, ScrapeEvent
+
+def fail_stale_jobs(timeout=None):
+    """
+    Mark running jobs whose worker stopped sending heartbeats as failed
+
+    A worker killed mid-job leaves its job running; without this the season
+    could never be scraped again, since a running job is reused.
+
+    Args:
+        timeout (float, optional): Seconds without a heartbeat, defaults to
+            settings.SCRAPE_JOB_TIMEOUT
+
+    Returns:
+        int: Number of jobs marked failed
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'SCRAPE_JOB_TIMEOUT', 300)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Q(status='running') & (
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+    failed = 0
+    for job in ScrapeJob.objects.filter(stale):
+        # Conditional on the same test, in case the worker has just finished
+        updated = ScrapeJob.objects.filter(stale, pk=job.pk).update(
+            status='failed',
+            error=f"Worker {job.worker} stopped responding",
+            finished_at=timezone.now()
+        )
+        if updated:
+            failed += 1
+            job.refresh_from_db()
+            ScrapeEvent.objects.create(job_id=job.pk, event='failed', data=get_job_progress(job))
+    return failed
+
+def claim_next_job(worker):
+    """
+    Claim the oldest queued scrape job for a worker
+
+    The claim is a conditional UPDATE on the queued status, so two workers
+    can never claim the same job. Running jobs whose worker has died are
+    failed first.
+
+    Args:
+        worker (str): Name of the claiming worker
+
+    Returns:
+        ScrapeJob: The claimed job, or None if nothing is queued
+    """
+    fail_stale_jobs()
+
+    while True:
+        job = ScrapeJob.objects.filter(status='queued').order_by('created', 'id').first()
+        if job is None:
+            return None
+
+        claimed = ScrapeJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', worker=worker, started_at=timezone.now(), heartbeat_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker got there first; try the next job
+
+class JobProgress:
+    """Progress callback for the ingestion pipeline that keeps a ScrapeJob up to date"""
+
+    def __init__(self, job):
+        self.job = job
+        self.errors = []
+
+    def update(self, **fields):
+        ScrapeJob.objects.filter(pk=self.job.pk).update(**fields)
+
+    def __call__(self, event, **data):
+        # Every event is also stored for the scrape form's event stream
+        ScrapeEvent.objects.create(job_id=self.job.pk, event=event, data=data)
+
+        if event == 'listed':
+            self.update(regattas_total=data['total'])
+        elif event == 'fetched':
+            self.update(regattas_fetched=F('regattas_fetched') + 1)
+        elif event == 'skipped':
+            self.update(
+                regattas_fetched=F('regattas_fetched') + 1,
+                regattas_done=F('regattas_done') + 1,
+                regattas_skipped=F('regattas_skipped') + 1,
+            )
+        elif event == 'saved':
+            self.update(
+                regattas_done=F('regattas_done') + 1,
+                rows_written=F('rows_written') + data['rows'],
+                sailors_added=F('sailors_added') + data['sailors_added'],
+            )
+        elif event == 'error':
+            self.errors.append(data['message'])
+            fields = {'errors': self.errors}
+            if data.get('regatta'):
+                fields['regattas_done'] = F('regattas_done') + 1
+            self.update(**fields)
+
+def send_heartbeats(job_id, stopped, interval):
+    """Refresh a running job's heartbeat every interval seconds until stopped is set"""
+    try:
+        while not stopped.wait(interval):
+            try:
+                ScrapeJob.objects.filter(pk=job_id, status='running').update(heartbeat_at=timezone.now())
+            except DatabaseError:
+                # The database may be busy with the scrape's own writes; try next time
+                pass
+    finally:
+        connection.close()
+
+def run_job(job):
+    """
+    Run a claimed scrape job to completion
+
+    A background thread keeps the job's heartbeat fresh meanwhile, so the
+    job is only failed as stale if this process dies.
+
+    Returns:
+        ScrapeJob: The job with its final status
+    """
+    from .ingest import ingest_season
+
+    stopped = threading.Event()
+    heartbeat = threading.Thread(
+        target=send_heartbeats,
+        args=(job.pk, stopped, getattr(settings, 'SCRAPE_JOB_HEARTBEAT', 30)),
+        name=f'scrape-heartbeat-{job.pk}',
+        daemon=True
+    )
+    heartbeat.start()
+    try:
+        ingest_season(job.season, progress=JobProgress(job))
+        status, error = 'done', ''
+    except Exception as e:
+        status, error = 'failed', str(e)
+    finally:
+        stopped.set()
+        heartbeat.join()
+
+    ScrapeJob.objects.filter(pk=job.pk).update(status=status, error=error, finished_at=timezone.now())
+    job.refresh_from_db()
+    ScrapeEvent.objects.create(job_id=job.pk, event=status, data=get_job_progress(job))
+    return job
+
+def get_job_progress(job):
+    """
+    Progress of a scrape job for the progress endpoint
+
+    Returns:
+        dict: Status, counters and errors of the job
+    """
+    return {
+        'id': job.id,
+        'season': job.season,
+        'status': job.status,
+        'regattas_total': job.regattas_total,
+        'regattas_fetched': job.regattas_fetched,
+        'regattas_done': job.regattas_done,
+        'regattas_skipped': job.regattas_skipped,
+        'sailors_added': job.sailors_added,
+        'rows_written': job.rows_written,
+        'errors': job.errors,
+        'error': job.error,
+        'created': job.created.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,211 @@
+# sailors/management/commands/benchmark_ingestion.py
+
+import contextlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from sailors.benchmarks import QueryCounter, get_commit, summarize
+from sailors.ingest import IngestPipeline
+from sailors.models import Result, Sailor
+from scraper import client
+from scraper.standin import StandInServer
+
+class Command(BaseCommand):
+    help = 'Benchmark season ingestion end to end against a local stand-in for the scoring site'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'seasons',
+            nargs='*',
+            default=['f24'],
+            help='Seasons to ingest, e.g. f24 s24',
+        )
+        parser.add_argument(
+            '--directory',
+            default=str(settings.BASE_DIR),
+            help='Archive directory the stand-in serves pages from',
+        )
+        parser.add_argument('--limit', type=int, default=0, help='Regattas per season to ingest, 0 for all')
+        parser.add_argument('--latency', type=float, default=0.0, help='Mean milliseconds added to every response')
+        parser.add_argument('--jitter', type=float, default=0.5, help='Fraction the latency varies by either way')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with a 503')
+        parser.add_argument('--workers', type=int, default=None, help='Regatta pages fetched at once')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for injected latency and errors')
+        parser.add_argument(
+            '--output',
+            default='ingestion_benchmark.json',
+            help='File to write the results to',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Earlier results file to compare against',
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options['error_rate'] < 1:
+            raise CommandError('--error-rate must be at least 0 and below 1')
+        if not os.path.isdir(options['directory']):
+            raise CommandError(f"No archive directory {options['directory']}")
+
+        workers = options['workers'] or getattr(settings, 'SCRAPE_MAX_WORKERS', 8)
+        params = {
+            'seasons': options['seasons'],
+            'limit': options['limit'],
+            'latency_ms': options['latency'],
+            'jitter': options['jitter'],
+            'error_rate': options['error_rate'],
+            'workers': workers,
+            'seed': options['seed'],
+        }
+
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': get_commit(),
+            'database': connection.vendor,
+            'params': params,
+        }
+
+        server = StandInServer(
+            options['directory'],
+            latency=options['latency'] / 1000,
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        ).start()
+        self.stdout.write(f'Stand-in scoring site at {server.base_url}')
+
+        # Ingest into a fresh test database, through a session pointed at the
+        # stand-in with the page cache off so every page is really fetched
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                SCRAPE_BASE_URL=server.base_url,
+                SCRAPE_TRANSPORT='live',
+                SCRAPE_CACHE_DIR='',
+                SCRAPE_MAX_WORKERS=workers,
+                # Never overwrite the saved listings the stand-in is serving
+                SCRAPE_DEBUG_HTML=False,
+            ):
+                client.configure()
+                request_timings = []
+                hook = lambda method, url, status, elapsed: request_timings.append(elapsed)
+                client.add_timing_hook(hook)
+                try:
+                    report.update(self.ingest(options['seasons'], options['limit'], workers))
+                finally:
+                    client.remove_timing_hook(hook)
+                report['stages']['request'] = summarize(request_timings)
+                report['sailors'] = Sailor.objects.count()
+                report['results'] = Result.objects.count()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            server.stop()
+            # Back to the session the settings describe
+            client.configure()
+
+        report['server'] = server.stats
+
+        self.stdout.write(
+            f"Ingested {report['regattas']} regattas ({report['results']} results) in "
+            f"{report['seconds']:.2f}s: {report['regattas_per_second']:.1f} regattas/s, "
+            f"{report['queries_per_regatta']:.1f} queries/regatta"
+        )
+        for name, result in report['stages'].items():
+            self.stdout.write(f"{name:<10} {self.describe(result)}")
+        self.stdout.write(
+            f"Stand-in served {server.stats['served']} pages, "
+            f"{server.stats['errors']} injected errors, {server.stats['not_found']} not found; "
+            f"{report['failed']} regattas failed"
+        )
+
+        if options['compare']:
+            self.compare(report, options['compare'])
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+
+    def ingest(self, seasons, limit, workers):
+        """
+        Run the ingestion pipeline over the seasons, then the rating update,
+        counting the queries of each
+
+        Returns:
+            dict: Totals, throughput and a summary per stage
+        """
+        pipeline = IngestPipeline(seasons, fetch_workers=workers, limit=limit, rate=False)
+
+        started = time.perf_counter()
+
+        # The scrape code reports progress with print; keep it out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Loading runs on this thread, so this counts every write
+            load_counter = QueryCounter()
+            with connection.execute_wrapper(load_counter):
+                results = pipeline.run()
+
+            rate_counter = QueryCounter()
+            if pipeline.rating_date:
+                with connection.execute_wrapper(rate_counter):
+                    pipeline.update_ratings()
+
+        elapsed = time.perf_counter() - started
+        regattas = results['regattas_changed']
+
+        stages = {name: summarize(stage_timings) for name, stage_timings in pipeline.timings.items()}
+        stages['load']['queries_per_regatta'] = load_counter.count / regattas if regattas else 0
+        stages['rate']['queries'] = rate_counter.count
+
+        return {
+            'regattas': regattas,
+            'failed': len(results['errors']),
+            'seconds': elapsed,
+            'regattas_per_second': regattas / elapsed if elapsed else 0,
+            'queries_per_regatta': (load_counter.count + rate_counter.count) / regattas if regattas else 0,
+            'stages': stages,
+        }
+
+    def describe(self, result):
+        """One-line summary of a stage"""
+        if not result['count']:
+            return 'not run'
+        line = (
+            f"{result['count']:>5} x  p50 {result['p50_ms']:8.2f} ms  "
+            f"p95 {result['p95_ms']:8.2f} ms  total {result['seconds']:.2f}s"
+        )
+        if 'queries_per_regatta' in result:
+            line += f", {result['queries_per_regatta']:.1f} queries/regatta"
+        if result.get('queries'):
+            line += f", {result['queries']} queries"
+        return line
+
+    def compare(self, report, path):
+        """Print the change in throughput and stage percentiles against an earlier results file"""
+        try:
+            with open(path) as f:
+                previous = json.load(f)
+            previous_stages = previous['stages']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        self.stdout.write(f'Compared with {path}:')
+        for key in ['regattas_per_second', 'queries_per_regatta']:
+            if previous.get(key):
+                change = (report[key] - previous[key]) / previous[key] * 100
+                self.stdout.write(f"  {key:<22} {previous[key]:.2f} -> {report[key]:.2f} ({change:+.1f}%)")
+        for name, result in report['stages'].items():
+            old = previous_stages.get(name, {})
+            for key in ['p50_ms', 'p95_ms']:
+                if key in result and old.get(key):
+                    change = (result[key] - old[key]) / old[key] * 100
+                    self.stdout.write(f"  {name + ' ' + key:<22} {old[key]:.2f} -> {result[key]:.2f} ({change:+.1f}%)")
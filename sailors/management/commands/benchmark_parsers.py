@@ -0,0 +1,103 @@
+# sailors/management/commands/benchmark_parsers.py
+
+import json
+import os
+import statistics
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.parsing import BACKENDS, backend_available, parse_html
+from sailors.ingest import parse_season_listing, parse_regatta_date, parse_regatta_sailors
+
+SEASON_FIXTURES = ['f21_debug.html', 'f22_debug.html', 'f23_debug.html', 'f24_debug.html',
+                   's22_debug.html', 's23_debug.html', 's24_debug.html']
+REGATTA_FIXTURE = 'regatta_sailors.html'
+
+def parse_season(html, backend, restricted):
+    soup = parse_html(html, only='table' if restricted else None, backend=backend)
+    return parse_season_listing(soup, 'https://scores.hssailing.org/season/')
+
+def parse_regatta(html, backend, restricted):
+    soup = parse_html(html, only=['table', 'time'] if restricted else None, backend=backend)
+    return parse_regatta_date(soup), parse_regatta_sailors(soup)
+
+class Command(BaseCommand):
+    help = 'Benchmark the HTML parser backends on the saved season and regatta pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Parses per page and configuration')
+        parser.add_argument('--directory', default=str(settings.BASE_DIR), help='Directory with the saved pages')
+        parser.add_argument('--output', help='File to write the results to as JSON')
+
+    def handle(self, *args, **options):
+        fixtures = [(name, parse_season) for name in SEASON_FIXTURES] + [(REGATTA_FIXTURE, parse_regatta)]
+        fixtures = [
+            (name, parse) for name, parse in fixtures
+            if os.path.exists(os.path.join(options['directory'], name))
+        ]
+        if not fixtures:
+            raise CommandError(f"No saved pages found in {options['directory']}")
+
+        backends = [backend for backend in BACKENDS if backend_available(backend)]
+        configurations = [(backend, restricted) for backend in backends for restricted in (False, True)]
+        self.stdout.write(f"Backends available: {', '.join(backends)}")
+
+        results = []
+        totals = {configuration: 0.0 for configuration in configurations}
+
+        for name, parse in fixtures:
+            with open(os.path.join(options['directory'], name), encoding='utf-8') as f:
+                html = f.read()
+
+            # The pure-Python full parse is the reference every backend must match
+            reference = None
+            for backend, restricted in configurations:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    # The parsers log what they find; keep the report readable
+                    with redirect_stdout(StringIO()):
+                        parsed = parse(html, backend, restricted)
+                    timings.append(time.perf_counter() - started)
+
+                if reference is None:
+                    with redirect_stdout(StringIO()):
+                        reference = parse(html, 'html.parser', False)
+
+                mean_ms = statistics.mean(timings) * 1000
+                totals[(backend, restricted)] += mean_ms
+                results.append({
+                    'page': name,
+                    'backend': backend,
+                    'restricted': restricted,
+                    'mean_ms': mean_ms,
+                    'min_ms': min(timings) * 1000,
+                    'matches': parsed == reference,
+                })
+
+        self.stdout.write(f"{'Page':<22} {'Backend':<12} {'Parse':<10} {'Mean ms':>8} {'Min ms':>8}  Output")
+        for row in results:
+            self.stdout.write(
+                f"{row['page']:<22} {row['backend']:<12} {'table' if row['restricted'] else 'full':<10} "
+                f"{row['mean_ms']:>8.2f} {row['min_ms']:>8.2f}  {'same' if row['matches'] else 'DIFFERENT'}"
+            )
+
+        baseline = totals[('html.parser', False)]
+        self.stdout.write('Total per pass:')
+        for (backend, restricted), total in totals.items():
+            self.stdout.write(
+                f"  {backend:<12} {'table' if restricted else 'full':<6} {total:>8.2f} ms "
+                f"({baseline / total if total else 0:.1f}x html.parser full)"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'results': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote parser benchmark results to {options['output']}"))
+
+        if not all(row['matches'] for row in results):
+            raise CommandError('Some backends parsed a page differently from html.parser')
@@ -0,0 +1,218 @@
+# sailors/management/commands/benchmark_ratings.py
+
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sailors.benchmarks import QueryCounter, get_commit, summarize
+from sailors.elo import calculate_elo_change, calculate_regatta_elo_changes, update_sailor_ratings
+from sailors.models import Regatta
+from sailors.synthetic import generate_history
+
+class Command(BaseCommand):
+    help = 'Benchmark the rating engine on a synthetic regatta history in a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sailors', type=int, default=2000, help='Number of synthetic sailors')
+        parser.add_argument('--regattas', type=int, default=300, help='Number of synthetic regattas')
+        parser.add_argument('--min-fleet', type=int, default=10, help='Fewest boats in a division')
+        parser.add_argument('--max-fleet', type=int, default=60, help='Most boats in a division')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic history')
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=50,
+            help='Number of regattas to time update_sailor_ratings on',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes passed to recalculate_elo (more than 1 is not expected to help)',
+        )
+        parser.add_argument(
+            '--sequential',
+            action='store_true',
+            help='Also time recalculate_elo --sequential (slow on large histories)',
+        )
+        parser.add_argument(
+            '--output',
+            default='rating_benchmark.json',
+            help='File to write the results to',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Earlier results file to compare against',
+        )
+
+    def handle(self, *args, **options):
+        if options['min_fleet'] < 2 or options['max_fleet'] < options['min_fleet']:
+            raise CommandError('Fleet sizes must satisfy 2 <= --min-fleet <= --max-fleet')
+        if options['sailors'] < options['min_fleet'] * 4:
+            raise CommandError('Need at least four sailors per boat in the smallest fleet')
+
+        params = {
+            key: options[key]
+            for key in ['sailors', 'regattas', 'min_fleet', 'max_fleet', 'seed', 'sample', 'workers']
+        }
+
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': get_commit(),
+            'database': connection.vendor,
+            'params': params,
+            'results': {},
+        }
+        results = report['results']
+
+        results['calculate_elo_change'] = self.time_calculate_elo_change(options['seed'])
+        results['calculate_regatta_elo_changes'] = self.time_regatta_changes(
+            options['min_fleet'], options['max_fleet'], options['seed']
+        )
+
+        # Everything that touches the database runs against a fresh test database
+        old_name = connection.settings_dict['NAME']
+        self.stdout.write('Creating benchmark database...')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            report['history'] = generate_history(
+                sailor_count=options['sailors'],
+                regatta_count=options['regattas'],
+                min_fleet=options['min_fleet'],
+                max_fleet=options['max_fleet'],
+                seed=options['seed'],
+            )
+            report['history']['generate_seconds'] = time.perf_counter() - started
+            self.stdout.write(
+                f"Generated {report['history']['regattas']} regattas with "
+                f"{report['history']['results']} results in {report['history']['generate_seconds']:.2f}s"
+            )
+
+            results['update_sailor_ratings'] = self.time_update_sailor_ratings(options['sample'])
+            results['recalculate_elo'] = self.time_recalculate(workers=options['workers'])
+            if options['sequential']:
+                results['recalculate_elo_sequential'] = self.time_recalculate(sequential=True)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for name, result in results.items():
+            self.stdout.write(f"{name:<32} {self.describe(result)}")
+
+        if options['compare']:
+            self.compare(results, options['compare'])
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+
+    def time_calculate_elo_change(self, seed, calls=200000):
+        """Time single pairwise comparisons"""
+        rng = random.Random(seed)
+        pairs = [
+            (rng.uniform(800, 1400), rng.uniform(800, 1400), rng.randint(1, 40), rng.randint(1, 40))
+            for _ in range(1000)
+        ]
+
+        started = time.perf_counter()
+        for i in range(calls):
+            sailor_elo, opponent_elo, sailor_place, opponent_place = pairs[i % 1000]
+            calculate_elo_change(sailor_elo, opponent_elo, sailor_place, opponent_place, 16, 40)
+        elapsed = time.perf_counter() - started
+
+        return {'calls': calls, 'seconds': elapsed, 'us_per_call': elapsed / calls * 1e6}
+
+    def time_regatta_changes(self, min_fleet, max_fleet, seed, regattas=500):
+        """Time the in-memory rating update of whole regattas"""
+        rng = np.random.default_rng(seed)
+        timings = []
+
+        for _ in range(regattas):
+            fleet_size = int(rng.integers(min_fleet, max_fleet + 1))
+            # Two sailors per boat in each of the A and B divisions
+            sailor_count = fleet_size * 4
+            ratings = rng.uniform(800, 1400, sailor_count)
+            k_factors = rng.choice([8, 12, 16, 20, 24], sailor_count).astype(np.float64)
+            places = np.concatenate([np.repeat(rng.permutation(fleet_size) + 1, 2) for _ in range(2)])
+            sailors = np.arange(sailor_count)
+            divisions = [('A', 0, fleet_size * 2), ('B', fleet_size * 2, sailor_count)]
+
+            started = time.perf_counter()
+            calculate_regatta_elo_changes(ratings, places, k_factors, sailors, divisions)
+            timings.append(time.perf_counter() - started)
+
+        return summarize(timings)
+
+    def time_update_sailor_ratings(self, sample):
+        """Time the database rating update of the first regattas in date order"""
+        timings = []
+        queries = []
+
+        for regatta in Regatta.objects.select_related('regatta_type').order_by('date', 'id')[:sample]:
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                update_sailor_ratings(regatta)
+                timings.append(time.perf_counter() - started)
+            queries.append(counter.count)
+
+        summary = summarize(timings)
+        summary['queries_per_regatta'] = statistics.mean(queries) if queries else 0
+        return summary
+
+    def time_recalculate(self, sequential=False, workers=1):
+        """Time the recalculate_elo command end to end"""
+        arguments = ['--sequential'] if sequential else ['--workers', str(workers)]
+        regattas = Regatta.objects.count()
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            call_command('recalculate_elo', *arguments, stdout=StringIO())
+            elapsed = time.perf_counter() - started
+
+        return {
+            'seconds': elapsed,
+            'regattas_per_second': regattas / elapsed if elapsed else 0,
+            'queries': counter.count,
+            'queries_per_regatta': counter.count / regattas if regattas else 0,
+        }
+
+    def describe(self, result):
+        """One-line summary of a benchmark result"""
+        if 'us_per_call' in result:
+            return f"{result['us_per_call']:.2f} us/call"
+        if 'mean_ms' in result:
+            line = f"mean {result['mean_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms"
+        else:
+            line = f"{result['seconds']:.2f}s, {result['regattas_per_second']:.1f} regattas/s"
+        if 'queries_per_regatta' in result:
+            line += f", {result['queries_per_regatta']:.1f} queries/regatta"
+        return line
+
+    def compare(self, results, path):
+        """Print the change in headline timings against an earlier results file"""
+        try:
+            with open(path) as f:
+                previous = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        self.stdout.write(f'Compared with {path}:')
+        for name, result in results.items():
+            if name not in previous:
+                continue
+            for key in ['us_per_call', 'mean_ms', 'seconds']:
+                if key in result and key in previous[name] and previous[name][key]:
+                    change = (result[key] - previous[name][key]) / previous[name][key] * 100
+                    self.stdout.write(f"  {name:<32} {key} {previous[name][key]:.2f} -> {result[key]:.2f} ({change:+.1f}%)")
+                    break
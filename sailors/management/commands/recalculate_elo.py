@@ -1,8 +1,15 @@
 # sailors/management/commands/recalculate_elo.py
 
-from django.core.management.base import BaseCommand
-from sailors.models import Sailor, Regatta
-from sailors.elo import update_sailor_ratings, get_current_season, apply_inactive_decay
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from sailors.models import Sailor, Regatta, RatingSnapshot, RatingCheckpoint, DecayRun
+from sailors.elo import (
+    update_sailor_ratings, get_current_season, apply_inactive_decay,
+    decay_inactive_sailors, record_regatta_activity,
+)
+from sailors.replay import recalculate_all, recalculate_from
 
 class Command(BaseCommand):
     help = 'Recalculate ELO ratings for all sailors'
@@ -13,11 +20,71 @@ class Command(BaseCommand):
             action='store_true',
             help='Apply inactive rating decay',
         )
+        parser.add_argument(
+            '--sequential',
+            action='store_true',
+            help='Update ratings regatta by regatta in the database instead of replaying in memory',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Worker processes for the in-memory replay (default 1). The replay is a '
+                'fraction of a second even on large histories, so more workers only add '
+                'process start-up time'
+            ),
+        )
+        parser.add_argument(
+            '--since',
+            help='Only replay from the season checkpoint before this date (YYYY-MM-DD)',
+        )
     
     def handle(self, *args, **options):
-        # Reset all sailor ratings to 1000
+        if options['sequential']:
+            self.recalculate_sequential()
+        else:
+            self.recalculate_in_memory(options['since'], options['workers'])
+        
+        # Apply decay if requested
+        if options['apply_decay']:
+            self.stdout.write('Applying rating decay for inactive sailors...')
+            decayed = apply_inactive_decay()
+            if decayed:
+                self.stdout.write(f'Decayed {decayed} inactive sailors')
+            else:
+                self.stdout.write(f'Decay was already applied for {get_current_season()}')
+        
+        self.stdout.write(self.style.SUCCESS(f'Successfully recalculated ELO ratings for {Sailor.objects.count()} sailors'))
+    
+    def recalculate_in_memory(self, since=None, workers=1):
+        """Replay the history in memory and write it back in bulk"""
+        started = time.perf_counter()
+        
+        if since:
+            try:
+                since_date = datetime.strptime(since, '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Invalid --since date. Use YYYY-MM-DD')
+            self.stdout.write(f'Replaying regattas from the checkpoint before {since_date}...')
+            history = recalculate_from(since_date, workers=workers)
+        else:
+            self.stdout.write('Replaying all regattas...')
+            history = recalculate_all(workers=workers)
+        
+        self.stdout.write(
+            f'Replayed {len(history.regatta_ids)} regattas '
+            f'({len(history.result_ids)} results, {len(history.sailor_ids)} sailors) '
+            f'in {time.perf_counter() - started:.2f}s'
+        )
+    
+    def recalculate_sequential(self):
+        """Reset every rating and update the database one regatta at a time"""
+        # Reset all sailor ratings to 1000 and clear activity counters
         self.stdout.write('Resetting all ELO ratings to 1000...')
-        Sailor.objects.all().update(elo_rating=1000)
+        Sailor.objects.all().update(elo_rating=1000, regatta_count=0, first_season='', last_season='')
+        RatingSnapshot.objects.all().delete()
+        RatingCheckpoint.objects.all().delete()
         
         # Get all regattas ordered by date
         regattas = Regatta.objects.all().order_by('date', 'id')
@@ -26,11 +93,11 @@ class Command(BaseCommand):
         # Process each regatta to update ELO ratings
         for i, regatta in enumerate(regattas):
             self.stdout.write(f'Processing regatta {i+1}/{total}: {regatta.name} ({regatta.season})')
+            sailor_ids = set(regatta.result_set.values_list('sailor_id', flat=True))
+            record_regatta_activity(regatta, sailor_ids)
             update_sailor_ratings(regatta)
         
-        # Apply decay if requested
-        if options['apply_decay']:
-            self.stdout.write('Applying rating decay for inactive sailors...')
-            apply_inactive_decay()
-        
-        self.stdout.write(self.style.SUCCESS(f'Successfully recalculated ELO ratings for {Sailor.objects.count()} sailors'))
\ No newline at end of file
+        # Keep any decay already applied this season
+        current_season = get_current_season()
+        if DecayRun.objects.filter(season=current_season).exists():
+            decay_inactive_sailors(current_season)
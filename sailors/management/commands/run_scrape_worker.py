@@ -0,0 +1,58 @@
+# sailors/management/commands/run_scrape_worker.py
+
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from sailors.jobs import claim_next_job, run_job
+from scraper import client
+
+class Command(BaseCommand):
+    help = 'Claim and run queued season scrape jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no jobs are queued instead of waiting for more',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between checks for queued jobs',
+        )
+        parser.add_argument(
+            '--name',
+            default=f'{socket.gethostname()}:{os.getpid()}',
+            help='Worker name recorded on claimed jobs',
+        )
+        client.add_transport_arguments(parser)
+    
+    def handle(self, *args, **options):
+        client.configure_from_options(options)
+        
+        self.stdout.write(f"Scrape worker {options['name']} started")
+        
+        while True:
+            job = claim_next_job(options['name'])
+            
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+                continue
+            
+            self.stdout.write(f'Running scrape job {job.id} for season {job.season}...')
+            job = run_job(job)
+            
+            if job.status == 'done':
+                self.stdout.write(self.style.SUCCESS(
+                    f'Job {job.id} done: {job.regattas_done}/{job.regattas_total} regattas, '
+                    f'{job.rows_written} rows written, {len(job.errors)} errors'
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f'Job {job.id} failed: {job.error}'))
+        
+        self.stdout.write('No queued scrape jobs left')
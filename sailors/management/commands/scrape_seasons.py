@@ -0,0 +1,188 @@
+# sailors/management/commands/scrape_seasons.py
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from sailors.elo import get_season_from_ordinal, get_season_ordinal
+from sailors.ingest import IngestPipeline
+from sailors.ingest.pipeline import SEASON_PATTERN
+from sailors.ingest.rate import update_ratings
+from sailors.models import ScrapeCheckpoint, ScrapeRun
+from scraper import client
+
+def expand_seasons(specs):
+    """
+    Expand season codes and ranges into a list of season codes
+
+    Args:
+        specs (list): Season codes and inclusive ranges, e.g. ['f19..s21', 'f23']
+
+    Returns:
+        list: Season codes in the order given, each once,
+            e.g. ['f19', 's20', 'f20', 's21', 'f23']
+    """
+    seasons = []
+    for spec in specs:
+        first, _, last = spec.lower().partition('..')
+        last = last or first
+        for season in (first, last):
+            if not SEASON_PATTERN.match(season):
+                raise ValueError(f"Invalid season {season!r}. Use 'f' or 's' followed by two digits (e.g., 'f23')")
+
+        start, end = get_season_ordinal(first), get_season_ordinal(last)
+        if start > end:
+            raise ValueError(f"Season range {spec} runs backwards")
+        for ordinal in range(start, end + 1):
+            season = get_season_from_ordinal(ordinal)
+            if season not in seasons:
+                seasons.append(season)
+    return seasons
+
+class Command(BaseCommand):
+    help = (
+        'Scrape the regattas of one or more seasons and update ratings once at the end. '
+        'Each finished regatta is checkpointed, so running the same command again after '
+        'an interruption resumes where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'seasons',
+            nargs='+',
+            help='Season codes or ranges to scrape, e.g. f19..s25 or f23 s24',
+        )
+        parser.add_argument(
+            '--run',
+            help='Name of the run to start or resume (default: the seasons as given)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Discard the checkpoints of an interrupted run and start it over',
+        )
+        parser.add_argument(
+            '--season-workers',
+            type=int,
+            help='Seasons listed at once (default SCRAPE_SEASON_WORKERS)',
+        )
+        parser.add_argument(
+            '--fetch-workers',
+            type=int,
+            help='Regatta pages downloaded at once (default SCRAPE_MAX_WORKERS)',
+        )
+        parser.add_argument(
+            '--parse-workers',
+            type=int,
+            help='Regatta pages parsed at once (default SCRAPE_PARSE_WORKERS)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Regattas to scrape per season, for trial runs',
+        )
+        parser.add_argument(
+            '--no-ratings',
+            action='store_true',
+            help='Skip the rating update at the end',
+        )
+        client.add_transport_arguments(parser)
+
+    def handle(self, *args, **options):
+        try:
+            seasons = expand_seasons(options['seasons'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        client.configure_from_options(options)
+
+        self.run = self.get_run(options['run'] or ' '.join(options['seasons']), seasons, options['restart'])
+        done = set(self.run.checkpoints.filter(status='done').values_list('url', flat=True))
+
+        pipeline = IngestPipeline(
+            seasons,
+            progress=self.progress,
+            season_workers=options['season_workers'],
+            fetch_workers=options['fetch_workers'],
+            parse_workers=options['parse_workers'],
+            limit=options['limit'],
+            # Ratings are replayed once below, from the earliest regatta of the whole run
+            rate=False,
+            skip=done,
+        )
+        results = pipeline.run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scraped {results['regattas_scraped']} of {results['regattas_listed']} regattas "
+            f"({results['regattas_changed']} changed, {results['regattas_skipped']} unchanged, "
+            f"{results['regattas_resumed']} already done), "
+            f"{results['sailors_added']} sailors and {results['results_added']} results added"
+        ))
+        if results['errors']:
+            self.stdout.write(self.style.WARNING(f"{len(results['errors'])} errors:"))
+            for error in results['errors']:
+                self.stdout.write(f"  {error}")
+
+        # The run's rating date covers regattas loaded before an interruption too,
+        # and update_ratings adds any date an earlier replay left pending
+        self.run.refresh_from_db()
+        if not options['no_ratings']:
+            since = update_ratings(self.run.rating_date)
+            if since:
+                self.stdout.write(self.style.SUCCESS(f"Ratings updated from {since}"))
+
+        if results['errors']:
+            # Failed regattas are tried again when the run is resumed
+            self.stdout.write(self.style.WARNING(f"Run {self.run.name!r} is unfinished; run the command again to retry"))
+        else:
+            ScrapeRun.objects.filter(pk=self.run.pk).update(finished_at=timezone.now())
+
+    def get_run(self, name, seasons, restart):
+        """
+        Start a new run, or resume the interrupted run of the same name
+
+        A finished run, or any run with restart, starts over from no checkpoints.
+
+        Returns:
+            ScrapeRun: The run, marked as started
+        """
+        run, created = ScrapeRun.objects.get_or_create(name=name, defaults={'seasons': seasons})
+
+        if not created and (restart or run.finished_at):
+            run.checkpoints.all().delete()
+            run.rating_date = None
+            run.finished_at = None
+        elif not created:
+            done = run.checkpoints.filter(status='done').count()
+            self.stdout.write(f"Resuming run {name!r}: {done} regattas already done")
+
+        run.seasons = seasons
+        run.started_at = timezone.now()
+        run.save()
+        return run
+
+    def checkpoint(self, data, status, error=''):
+        ScrapeCheckpoint.objects.update_or_create(
+            run=self.run,
+            url=data['url'],
+            defaults={'season': data['season'], 'status': status, 'error': error},
+        )
+
+    def progress(self, event, **data):
+        """Checkpoint each regatta, and report the events worth seeing among the pipeline's own output"""
+        if event == 'listed':
+            line = f"Listed {data['season']}: {data['total']} regattas so far"
+            if data['resumed']:
+                line += f", {data['resumed']} of them already done"
+            self.stdout.write(line)
+        elif event == 'skipped':
+            self.checkpoint(data, 'done')
+        elif event == 'saved':
+            # Reported inside the regatta's transaction, so this commits with it
+            self.checkpoint(data, 'done')
+            rating_date = date.fromisoformat(data['rating_date'])
+            if self.run.rating_date is None or rating_date < self.run.rating_date:
+                self.run.rating_date = rating_date
+                ScrapeRun.objects.filter(pk=self.run.pk).update(rating_date=rating_date)
+        elif event == 'error' and data.get('url'):
+            self.checkpoint(data, 'failed', data['message'])
@@ -0,0 +1,54 @@
+# sailors/management/commands/whatif_weights.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from sailors.whatif import compare_regatta_weights
+
+class Command(BaseCommand):
+    help = 'Compare ratings under different regatta type weights without changing the database'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--weight',
+            action='append',
+            default=[],
+            metavar='TYPE=WEIGHT',
+            help='Regatta type weight to try, e.g. "National Championship=1.5" (repeatable)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=25,
+            help='Number of sailors to show',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Reload the results snapshot from the database',
+        )
+    
+    def handle(self, *args, **options):
+        weights = {}
+        for override in options['weight']:
+            name, _, weight = override.rpartition('=')
+            try:
+                weights[name.strip()] = float(weight)
+            except ValueError:
+                raise CommandError(f'Invalid weight "{override}". Use TYPE=WEIGHT')
+        
+        started = time.perf_counter()
+        try:
+            comparison = compare_regatta_weights(weights, top=options['top'], refresh=options['refresh'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(f"{'Rank':>4}  {'Change':>6}  {'Rating':>7}  {'Was':>7}  Sailor")
+        for row in comparison['leaderboard']:
+            change = f"{row['rank_change']:+d}" if row['rank_change'] else '-'
+            self.stdout.write(
+                f"{row['rank']:>4}  {change:>6}  {row['rating']:>7.1f}  "
+                f"{row['baseline_rating']:>7.1f}  {row['name']} ({row['school']})"
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'Compared weights in {time.perf_counter() - started:.2f}s'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+def season_ordinal(season):
+    return int(season[1:]) * 2 + (1 if season[0] == 'f' else 0)
+
+
+def backfill_activity_counters(apps, schema_editor):
+    Sailor = apps.get_model('sailors', 'Sailor')
+    Result = apps.get_model('sailors', 'Result')
+
+    activity = {}
+    for sailor_id, regatta_id, season in Result.objects.values_list(
+        'sailor_id', 'regatta_id', 'regatta__season'
+    ).distinct():
+        regattas, seasons = activity.setdefault(sailor_id, (set(), set()))
+        regattas.add(regatta_id)
+        seasons.add(season)
+
+    sailors = []
+    for sailor in Sailor.objects.only('id'):
+        if sailor.id not in activity:
+            continue
+        regattas, seasons = activity[sailor.id]
+        sailor.regatta_count = len(regattas)
+        sailor.first_season = min(seasons, key=season_ordinal)
+        sailor.last_season = max(seasons, key=season_ordinal)
+        sailors.append(sailor)
+
+    Sailor.objects.bulk_update(
+        sailors, ['regatta_count', 'first_season', 'last_season'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0006_interestedsailor_sailing_resume_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sailor',
+            name='first_season',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='sailor',
+            name='last_season',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='sailor',
+            name='regatta_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_activity_counters, migrations.RunPython.noop),
+    ]
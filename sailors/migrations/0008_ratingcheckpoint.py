@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0007_sailor_activity_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10, unique=True)),
+                ('date', models.DateField()),
+                ('first_regatta_id', models.IntegerField()),
+                ('current_season', models.CharField(max_length=10)),
+                ('data', models.JSONField()),
+                ('created', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date', 'first_regatta_id'],
+            },
+        ),
+    ]
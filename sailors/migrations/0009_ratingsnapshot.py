@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 14:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0008_ratingcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rating_before', models.FloatField()),
+                ('rating_after', models.FloatField()),
+                ('regatta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_snapshots', to='sailors.regatta')),
+                ('sailor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_snapshots', to='sailors.sailor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sailor', 'date'], name='sailors_rat_sailor__971b1b_idx'), models.Index(fields=['date'], name='sailors_rat_date_f71399_idx')],
+                'unique_together': {('sailor', 'regatta')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0009_ratingsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DecayRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10, unique=True)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+                ('sailors_affected', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
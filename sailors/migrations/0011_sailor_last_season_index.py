@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0010_decayrun'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sailor',
+            name='last_season',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0011_sailor_last_season_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='regatta',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0012_regatta_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('regattas_total', models.PositiveIntegerField(default=0)),
+                ('regattas_fetched', models.PositiveIntegerField(default=0)),
+                ('regattas_done', models.PositiveIntegerField(default=0)),
+                ('regattas_skipped', models.PositiveIntegerField(default=0)),
+                ('sailors_added', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
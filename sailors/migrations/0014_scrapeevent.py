@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0013_scrapejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='sailors.scrapejob')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['job', 'id'], name='sailors_scr_job_id_735a1c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0014_scrapeevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('seasons', models.JSONField(default=list)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('rating_date', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField()),
+                ('season', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('failed', 'Failed')], max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='sailors.scraperun')),
+            ],
+            options={
+                'unique_together': {('run', 'url')},
+            },
+        ),
+    ]
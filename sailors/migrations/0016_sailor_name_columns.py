@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:41
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_name_columns(apps, schema_editor):
+    Sailor = apps.get_model('sailors', 'Sailor')
+
+    sailors = []
+    for sailor in Sailor.objects.only('id', 'name'):
+        match = re.search(r"'(\d{2})(\*?)", sailor.name)
+        if match:
+            sailor.display_name = sailor.name.replace(f" {match.group(0)}", "")
+            sailor.grad_year = int(match.group(1))
+            sailor.grad_year_asterisk = bool(match.group(2))
+        else:
+            sailor.display_name = sailor.name
+        sailors.append(sailor)
+
+    Sailor.objects.bulk_update(
+        sailors, ['display_name', 'grad_year', 'grad_year_asterisk'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0015_scraperun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sailor',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='sailor',
+            name='grad_year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sailor',
+            name='grad_year_asterisk',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='sailor',
+            index=models.Index(fields=['grad_year', 'grad_year_asterisk'], name='sailors_sai_grad_ye_ee3506_idx'),
+        ),
+        migrations.RunPython(backfill_name_columns, migrations.RunPython.noop),
+    ]
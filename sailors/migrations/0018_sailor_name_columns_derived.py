@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0017_scrapejob_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sailor',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='sailor',
+            name='grad_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='sailor',
+            name='grad_year_asterisk',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
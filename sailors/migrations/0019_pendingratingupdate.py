@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sailors', '0018_sailor_name_columns_derived'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRatingUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
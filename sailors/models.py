@@ -1,6 +1,14 @@
 # sailors/models.py
+import re
+
 from django.db import models
 
+# Graduation year as the scoring site shows it after a name, e.g. 'Anton Schmid '26*'
+GRAD_YEAR_PATTERN = re.compile(r"'(\d{2})(\*?)")
+
+# Sailor columns derived from the name
+NAME_COLUMNS = ('display_name', 'grad_year', 'grad_year_asterisk')
+
 class School(models.Model):
     """High school with sailing team"""
     name = models.CharField(max_length=200, unique=True)
@@ -24,21 +32,92 @@ class Regatta(models.Model):
     season = models.CharField(max_length=10)  # e.g., "f22" or "s23"
     regatta_type = models.ForeignKey(RegattaType, on_delete=models.CASCADE)
     is_jv = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # Hash of the last saved results page
     
     def __str__(self):
         return f"{self.name} ({self.season})"
 
 class Sailor(models.Model):
     """High school sailor"""
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200)  # Name with graduation year, e.g. "Anton Schmid '26"
     school = models.ForeignKey(School, on_delete=models.CASCADE)
     elo_rating = models.FloatField(default=1000)  # Starting ELO score
     
+    # The name split up so views can filter without parsing names; derived
+    # from name on save, and by set_name_columns on bulk paths
+    display_name = models.CharField(max_length=200, blank=True, default='', db_index=True, editable=False)  # e.g., "Anton Schmid"
+    grad_year = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)  # Two digits, e.g. 26
+    grad_year_asterisk = models.BooleanField(default=False, editable=False)  # Year shown with an asterisk, e.g. '26*
+    
+    # Activity counters, kept up to date on ingest and by rating replays
+    regatta_count = models.PositiveIntegerField(default=0)
+    first_season = models.CharField(max_length=10, blank=True, default='')  # e.g., "f22"
+    last_season = models.CharField(max_length=10, blank=True, default='', db_index=True)  # Last season competed
+    
     class Meta:
         unique_together = ('name', 'school')
+        indexes = [
+            models.Index(fields=['grad_year', 'grad_year_asterisk']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.school.name}"
+    
+    def save(self, *args, **kwargs):
+        # Keep the split name columns in step with the name
+        self.set_name_columns()
+        if kwargs.get('update_fields') is not None and 'name' in kwargs['update_fields']:
+            kwargs['update_fields'] = list(kwargs['update_fields']) + list(NAME_COLUMNS)
+        super().save(*args, **kwargs)
+    
+    def set_name_columns(self):
+        """Fill display_name, grad_year and grad_year_asterisk from name"""
+        for field, value in self.split_name(self.name).items():
+            setattr(self, field, value)
+    
+    @staticmethod
+    def parse_grad_year(label):
+        """
+        Split a graduation year label into the stored columns
+        
+        Args:
+            label (str): Label like "'26" or "'26*", or None
+        
+        Returns:
+            tuple: (two-digit year or None, asterisk flag)
+        """
+        match = GRAD_YEAR_PATTERN.search(label or '')
+        if not match:
+            return None, False
+        return int(match.group(1)), bool(match.group(2))
+    
+    @staticmethod
+    def split_name(name):
+        """
+        Split a stored "Name 'YY" name into the display name and graduation year
+        
+        Returns:
+            dict: display_name, grad_year and grad_year_asterisk
+        """
+        match = GRAD_YEAR_PATTERN.search(name)
+        if not match:
+            return {'display_name': name, 'grad_year': None, 'grad_year_asterisk': False}
+        return {
+            'display_name': name.replace(f" {match.group(0)}", ""),
+            'grad_year': int(match.group(1)),
+            'grad_year_asterisk': bool(match.group(2)),
+        }
+    
+    @staticmethod
+    def format_grad_year(grad_year, asterisk=False):
+        """Graduation year label like "'26" or "'26*", or "-" without a year"""
+        if grad_year is None:
+            return "-"
+        return f"'{grad_year:02d}{'*' if asterisk else ''}"
+    
+    @property
+    def grad_year_label(self):
+        return self.format_grad_year(self.grad_year, self.grad_year_asterisk)
 
 class Result(models.Model):
     sailor = models.ForeignKey(Sailor, on_delete=models.CASCADE)
@@ -54,6 +133,141 @@ class Result(models.Model):
     def __str__(self):
         return f"{self.sailor.name} - {self.regatta.name} - Div {self.division} - {self.position}"
 
+class RatingSnapshot(models.Model):
+    """A sailor's rating before and after a regatta"""
+    sailor = models.ForeignKey(Sailor, on_delete=models.CASCADE, related_name='rating_snapshots')
+    regatta = models.ForeignKey(Regatta, on_delete=models.CASCADE, related_name='rating_snapshots')
+    date = models.DateField()  # Copy of regatta.date so date queries stay on one index
+    rating_before = models.FloatField()
+    rating_after = models.FloatField()
+    
+    class Meta:
+        unique_together = ('sailor', 'regatta')
+        indexes = [
+            models.Index(fields=['sailor', 'date']),
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.sailor.name} - {self.regatta.name}: {self.rating_before:.0f} -> {self.rating_after:.0f}"
+
+class DecayRun(models.Model):
+    """Ledger of inactive rating decay, at most one run per season"""
+    season = models.CharField(max_length=10, unique=True)
+    applied_at = models.DateTimeField(auto_now_add=True)
+    sailors_affected = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Decay {self.season} ({self.sailors_affected} sailors)"
+
+class PendingRatingUpdate(models.Model):
+    """Date a loaded regatta affects, kept until ratings are replayed from it or earlier"""
+    date = models.DateField(unique=True)
+    created = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Ratings pending from {self.date}"
+
+class RatingCheckpoint(models.Model):
+    """Sailor ratings and activity counters saved at the start of a season"""
+    season = models.CharField(max_length=10, unique=True)  # Season that starts here
+    date = models.DateField()  # Date of the first regatta of the season
+    first_regatta_id = models.IntegerField()  # Regattas before (date, id) are included
+    current_season = models.CharField(max_length=10)  # Season weights were relative to this
+    data = models.JSONField()  # Column lists of sailor ids, ratings and counters
+    created = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['date', 'first_regatta_id']
+    
+    def __str__(self):
+        return f"Checkpoint {self.season} ({self.date})"
+
+class ScrapeJob(models.Model):
+    """Season scrape queued by the web app and run by run_scrape_worker"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    season = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', db_index=True)
+    worker = models.CharField(max_length=100, blank=True, default='')  # Worker that claimed the job
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)  # Last sign of life from the running worker
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    # Progress
+    regattas_total = models.PositiveIntegerField(default=0)
+    regattas_fetched = models.PositiveIntegerField(default=0)
+    regattas_done = models.PositiveIntegerField(default=0)
+    regattas_skipped = models.PositiveIntegerField(default=0)
+    sailors_added = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # One message per failed regatta
+    error = models.TextField(blank=True, default='')  # Why the whole job failed
+    
+    class Meta:
+        ordering = ['-created']
+    
+    def __str__(self):
+        return f"Scrape {self.season} ({self.status})"
+
+class ScrapeEvent(models.Model):
+    """Progress event of a scrape job, streamed to the scrape form"""
+    job = models.ForeignKey(ScrapeJob, on_delete=models.CASCADE, related_name='events')
+    event = models.CharField(max_length=20)  # fetched, parsed, skipped, saved, ratings, error, done, failed
+    data = models.JSONField(default=dict, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['job', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.job} {self.event}"
+
+class ScrapeRun(models.Model):
+    """Multi-season scrape started by the scrape_seasons command, resumable after a crash"""
+    name = models.CharField(max_length=100, unique=True)  # Season spec by default, e.g. f19..s25
+    seasons = models.JSONField(default=list)
+    created = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)  # Latest start or resume
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Earliest date any loaded regatta affects; ratings replay from here at the end
+    rating_date = models.DateField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created']
+    
+    def __str__(self):
+        return f"Scrape run {self.name}"
+
+class ScrapeCheckpoint(models.Model):
+    """Outcome of one regatta in a scrape run; done regattas are not fetched again on resume"""
+    STATUS_CHOICES = [
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    run = models.ForeignKey(ScrapeRun, on_delete=models.CASCADE, related_name='checkpoints')
+    url = models.URLField()
+    season = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True, default='')
+    updated = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('run', 'url')
+    
+    def __str__(self):
+        return f"{self.run.name} {self.url} ({self.status})"
+
 # sailors/models.py - update the InterestedSailor model
 
 class InterestedSailor(models.Model):
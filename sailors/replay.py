@@ -0,0 +1,669 @@
+# sailors/replay.py
+
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .elo import (
+    INACTIVE_DECAY,
+    calculate_wave_elo_changes,
+    get_current_season,
+    get_k_factor_for_count,
+    get_season_from_ordinal,
+    get_season_ordinal,
+    get_season_weight,
+)
+from .models import Regatta, Result, Sailor, RatingCheckpoint, RatingSnapshot, DecayRun
+
+DEFAULT_RATING = 1000.0
+
+class RatingHistory:
+    """
+    Every regatta and result needed to replay ratings, loaded once into
+    compact arrays
+
+    Regattas are stored in chronological order (date, then id). Results are
+    sorted by regatta, then division, so each division is a contiguous slice
+    of the result arrays.
+    """
+
+    def __init__(self, regattas, results):
+        """
+        Args:
+            regattas: Rows of (id, date, season, regatta type weight,
+                regatta type name) in chronological order
+            results: Rows of (id, regatta id, sailor id, division, place)
+        """
+        self.regatta_ids = np.array([row[0] for row in regattas], dtype=np.int64)
+        self.regatta_dates = [row[1] for row in regattas]
+        self.regatta_seasons = [row[2] for row in regattas]
+        self.regatta_season_ordinals = np.array(
+            [get_season_ordinal(season) for season in self.regatta_seasons], dtype=np.int64
+        )
+        self.regatta_weights = np.array([row[3] for row in regattas], dtype=np.float64)
+        self.regatta_types = [row[4] for row in regattas]
+
+        regatta_index = {regatta_id: i for i, regatta_id in enumerate(self.regatta_ids.tolist())}
+        results = sorted(
+            (row for row in results if row[1] in regatta_index),
+            key=lambda row: (regatta_index[row[1]], row[3], row[0])
+        )
+
+        self.result_ids = np.array([row[0] for row in results], dtype=np.int64)
+        self.result_regattas = np.array([regatta_index[row[1]] for row in results], dtype=np.int64)
+        self.result_divisions = [row[3] for row in results]
+        self.result_places = np.array([row[4] for row in results], dtype=np.float64)
+
+        # Sailors are addressed by a compact index into the rating arrays
+        self.sailor_ids, self.result_sailors = np.unique(
+            np.array([row[2] for row in results], dtype=np.int64),
+            return_inverse=True
+        )
+
+        # (division, start, stop) for every division of every regatta
+        self.regatta_divisions = [[] for _ in regattas]
+        start = 0
+        for i in range(1, len(results) + 1):
+            if (i == len(results) or
+                    self.result_regattas[i] != self.result_regattas[start] or
+                    self.result_divisions[i] != self.result_divisions[start]):
+                self.regatta_divisions[self.result_regattas[start]].append(
+                    (self.result_divisions[start], start, i)
+                )
+                start = i
+
+        # Results of regatta i are result_regattas[regatta_bounds[i]:regatta_bounds[i + 1]]
+        self.regatta_bounds = np.searchsorted(
+            self.result_regattas, np.arange(len(self.regatta_ids) + 1)
+        )
+
+    def regatta_sailors(self, regatta):
+        """Sailor indexes entered in a regatta, without duplicates"""
+        start, stop = self.regatta_bounds[regatta], self.regatta_bounds[regatta + 1]
+        return np.unique(self.result_sailors[start:stop])
+
+    @classmethod
+    def load(cls, regattas=None):
+        """
+        Load the history with one query per table
+
+        Args:
+            regattas (QuerySet, optional): Restrict the history to these regattas
+        """
+        results = Result.objects.all()
+        if regattas is None:
+            regattas = Regatta.objects.all()
+        else:
+            results = results.filter(regatta__in=regattas.values('id'))
+
+        regatta_rows = regattas.order_by('date', 'id').values_list(
+            'id', 'date', 'season', 'regatta_type__weight', 'regatta_type__name'
+        )
+        result_rows = results.values_list('id', 'regatta_id', 'sailor_id', 'division', 'place')
+        return cls(list(regatta_rows), list(result_rows))
+
+    def save(self, path, fingerprint=''):
+        """
+        Save the history as a columnar NumPy archive
+
+        Args:
+            path: File to write
+            fingerprint (str): Database state the history was loaded from
+        """
+        np.savez_compressed(
+            path,
+            fingerprint=np.array(fingerprint),
+            regatta_ids=self.regatta_ids,
+            regatta_dates=np.array([day.toordinal() for day in self.regatta_dates], dtype=np.int64),
+            regatta_seasons=np.array(self.regatta_seasons, dtype=str),
+            regatta_weights=self.regatta_weights,
+            regatta_types=np.array(self.regatta_types, dtype=str),
+            result_ids=self.result_ids,
+            result_regatta_ids=self.regatta_ids[self.result_regattas],
+            result_sailor_ids=self.sailor_ids[self.result_sailors],
+            result_divisions=np.array(self.result_divisions, dtype=str),
+            result_places=self.result_places.astype(np.int64),
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a history saved with save()
+
+        Returns:
+            tuple: (RatingHistory, fingerprint)
+        """
+        with np.load(path) as archive:
+            regattas = zip(
+                archive['regatta_ids'].tolist(),
+                [date.fromordinal(day) for day in archive['regatta_dates'].tolist()],
+                archive['regatta_seasons'].tolist(),
+                archive['regatta_weights'].tolist(),
+                archive['regatta_types'].tolist(),
+            )
+            results = zip(
+                archive['result_ids'].tolist(),
+                archive['result_regatta_ids'].tolist(),
+                archive['result_sailor_ids'].tolist(),
+                archive['result_divisions'].tolist(),
+                archive['result_places'].tolist(),
+            )
+            return cls(list(regattas), list(results)), str(archive['fingerprint'])
+
+    def with_weights(self, weights):
+        """
+        Copy of the history with some regatta type weights overridden
+
+        Args:
+            weights (dict): Map of regatta type name to weight
+        """
+        history = copy.copy(self)
+        history.regatta_weights = np.array([
+            weights.get(regatta_type, weight)
+            for regatta_type, weight in zip(self.regatta_types, self.regatta_weights.tolist())
+        ], dtype=np.float64)
+        return history
+
+class ReplayState:
+    """
+    Ratings and activity counters for a set of sailors during a replay
+    """
+
+    def __init__(self, sailor_ids):
+        self.sailor_ids = np.asarray(sailor_ids, dtype=np.int64)
+        size = len(self.sailor_ids)
+        self.ratings = np.full(size, DEFAULT_RATING)
+        self.regatta_counts = np.zeros(size, dtype=np.int64)
+        # Season ordinals, -1 until the sailor has competed
+        self.first_seasons = np.full(size, -1, dtype=np.int64)
+        self.last_seasons = np.full(size, -1, dtype=np.int64)
+
+    def record_activity(self, sailors, season_ordinal):
+        """Count a regatta for each sailor index and widen their season range"""
+        self.regatta_counts[sailors] += 1
+        first = self.first_seasons[sailors]
+        self.first_seasons[sailors] = np.where(
+            first < 0, season_ordinal, np.minimum(first, season_ordinal)
+        )
+        self.last_seasons[sailors] = np.maximum(self.last_seasons[sailors], season_ordinal)
+
+    def copy(self):
+        state = ReplayState(self.sailor_ids)
+        state.ratings[:] = self.ratings
+        state.regatta_counts[:] = self.regatta_counts
+        state.first_seasons[:] = self.first_seasons
+        state.last_seasons[:] = self.last_seasons
+        return state
+
+    def as_dict(self):
+        """Map of sailor id to (rating, regatta count, first season, last season)"""
+        return dict(zip(
+            self.sailor_ids.tolist(),
+            zip(
+                self.ratings.tolist(),
+                self.regatta_counts.tolist(),
+                self.first_seasons.tolist(),
+                self.last_seasons.tolist(),
+            )
+        ))
+
+    @classmethod
+    def from_dict(cls, values, sailor_ids=None):
+        """
+        Build a state from a map of sailor id to (rating, count, first, last)
+
+        Args:
+            values (dict): Saved values per sailor id
+            sailor_ids (optional): Sailors to include; sailors missing from
+                values start from scratch
+        """
+        if sailor_ids is None:
+            sailor_ids = sorted(values)
+        state = cls(sailor_ids)
+        for i, sailor_id in enumerate(state.sailor_ids.tolist()):
+            if sailor_id in values:
+                rating, count, first, last = values[sailor_id]
+                state.ratings[i] = rating
+                state.regatta_counts[i] = count
+                state.first_seasons[i] = first
+                state.last_seasons[i] = last
+        return state
+
+    def to_data(self):
+        """Column lists suitable for RatingCheckpoint.data"""
+        return {
+            'sailor_ids': self.sailor_ids.tolist(),
+            'ratings': self.ratings.tolist(),
+            'regatta_counts': self.regatta_counts.tolist(),
+            'first_seasons': self.first_seasons.tolist(),
+            'last_seasons': self.last_seasons.tolist(),
+        }
+
+    @classmethod
+    def from_data(cls, data):
+        state = cls(data['sailor_ids'])
+        state.ratings[:] = data['ratings']
+        state.regatta_counts[:] = data['regatta_counts']
+        state.first_seasons[:] = data['first_seasons']
+        state.last_seasons[:] = data['last_seasons']
+        return state
+
+class ReplayResult:
+    """
+    Output of replay_history
+
+    Attributes:
+        state (ReplayState): Ratings and counters after the last regatta
+        result_changes: ELO change per result of the history
+        checkpoints: (regatta index, ReplayState) pairs, each taken just
+            before the first regatta of a new season
+        snapshot_regattas, snapshot_sailors: Regatta and sailor index of
+            every rating snapshot
+        snapshot_before, snapshot_after: Rating of the sailor before and
+            after that regatta
+    """
+
+    def __init__(self, state, result_changes, checkpoints, snapshots):
+        self.state = state
+        self.result_changes = result_changes
+        self.checkpoints = checkpoints
+        if snapshots:
+            columns = [np.concatenate(column) for column in zip(*snapshots)]
+        else:
+            columns = [np.zeros(0, dtype=np.int64)] * 2 + [np.zeros(0)] * 2
+        (self.snapshot_regattas, self.snapshot_sailors,
+         self.snapshot_before, self.snapshot_after) = columns
+
+def season_segments(history, season_ordinal=None):
+    """
+    Split the history at every point where a later season is first reached
+
+    Args:
+        history (RatingHistory): Loaded history
+        season_ordinal (int, optional): Season the replay starts in
+
+    Returns:
+        list: (starts a new season, regatta indexes) for each segment
+    """
+    segments = []
+    for regatta in range(len(history.regatta_ids)):
+        regatta_season = history.regatta_season_ordinals[regatta]
+        if season_ordinal is None or regatta_season > season_ordinal:
+            segments.append((season_ordinal is not None, []))
+            season_ordinal = regatta_season
+        elif not segments:
+            segments.append((False, []))
+        segments[-1][1].append(regatta)
+    return segments
+
+def build_waves(history, regattas):
+    """
+    Group regattas into dependency waves
+
+    Each regatta goes into the wave after the latest wave holding any of its
+    sailors, so regattas in one wave share no sailor and regattas that share
+    a sailor keep their chronological order.
+
+    Args:
+        history (RatingHistory): Loaded history
+        regattas: Regatta indexes in chronological order
+
+    Returns:
+        list: Lists of regatta indexes, one per wave
+    """
+    sailor_waves = np.full(len(history.sailor_ids), -1, dtype=np.int64)
+    waves = []
+
+    for regatta in regattas:
+        sailors = history.regatta_sailors(regatta)
+        wave = int(sailor_waves[sailors].max()) + 1 if len(sailors) else 0
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(regatta)
+        sailor_waves[sailors] = wave
+
+    return waves
+
+def replay_history(history, state=None, current_season=None, season_ordinal=None, workers=1):
+    """
+    Replay every regatta in chronological order in memory
+
+    Activity counters are rebuilt as the replay goes, so each regatta uses
+    the K-factor the sailor had at the time it was sailed. The state is
+    copied every time the replay crosses into a new season, and every
+    sailor's rating before and after each regatta is recorded.
+
+    With more than one worker, the regattas of each season are grouped into
+    dependency waves and each wave is split into one batch per worker.
+    Regattas in a wave share no sailor, so the result is identical to a
+    sequential replay. Workers are always spawned rather than forked, as
+    they are on Windows and macOS, so they never inherit the parent's
+    database connections. The replay itself is a small part of a full
+    recalculation, so extra workers rarely pay for their start-up.
+
+    Args:
+        history (RatingHistory): Loaded history
+        state (ReplayState, optional): Starting state for history.sailor_ids
+        current_season (str, optional): Override for current season
+        season_ordinal (int, optional): Season the replay starts in, so no
+            checkpoint is taken for it again
+        workers (int): Number of worker processes
+
+    Returns:
+        ReplayResult: Final state, result changes, checkpoints and snapshots
+    """
+    if not current_season:
+        current_season = get_current_season()
+    if state is None:
+        state = ReplayState(history.sailor_ids)
+
+    season_weights = {
+        season: get_season_weight(season, current_season)
+        for season in set(history.regatta_seasons)
+    }
+    k_factor_table = np.array([get_k_factor_for_count(count) for count in range(21)], dtype=np.float64)
+
+    result_changes = np.zeros(len(history.result_ids))
+    checkpoints = []
+    snapshots = []
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    try:
+        for new_season, regattas in season_segments(history, season_ordinal):
+            # Save a checkpoint the first time a later season is reached
+            if new_season:
+                checkpoints.append((regattas[0], state.copy()))
+
+            waves = build_waves(history, regattas) if executor else [[regatta] for regatta in regattas]
+
+            for wave in waves:
+                entries = []
+                tasks = []
+                for regatta in wave:
+                    sailors = history.regatta_sailors(regatta)
+                    state.record_activity(sailors, history.regatta_season_ordinals[regatta])
+
+                    start, stop = history.regatta_bounds[regatta], history.regatta_bounds[regatta + 1]
+                    entries.append((regatta, sailors, start, stop))
+                    tasks.append((
+                        state.ratings[sailors],
+                        history.result_places[start:stop],
+                        k_factor_table[np.minimum(state.regatta_counts[sailors], 20)],
+                        np.searchsorted(sailors, history.result_sailors[start:stop]),
+                        [(division, division_start - start, division_stop - start)
+                         for division, division_start, division_stop in history.regatta_divisions[regatta]],
+                        history.regatta_weights[regatta],
+                        season_weights[history.regatta_seasons[regatta]],
+                    ))
+
+                if executor and len(tasks) > 1:
+                    # One batch per worker, so each process gets a share of the wave at once
+                    batches = np.array_split(np.arange(len(tasks)), min(workers, len(tasks)))
+                    outputs = [
+                        output
+                        for batch in executor.map(calculate_wave_elo_changes, [[tasks[i] for i in batch] for batch in batches])
+                        for output in batch
+                    ]
+                else:
+                    outputs = calculate_wave_elo_changes(tasks)
+
+                for (regatta, sailors, start, stop), task, (ratings, changes) in zip(entries, tasks, outputs):
+                    state.ratings[sailors] = ratings
+                    result_changes[start:stop] = changes
+                    snapshots.append((
+                        np.full(len(sailors), regatta, dtype=np.int64),
+                        sailors,
+                        task[0],
+                        ratings,
+                    ))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return ReplayResult(state, result_changes, checkpoints, snapshots)
+
+def save_sailor_values(values, current_season, batch_size=500):
+    """
+    Write ratings and activity counters, touching only sailors that changed
+
+    If inactive decay has already been applied this season, it is applied
+    to the replayed ratings too, so a replay neither drops nor repeats it.
+
+    Args:
+        values (dict): Map of sailor id to (rating, count, first, last); sailors
+            not in the map are reset to the default rating with no activity
+        current_season (str): Season used to decide who is inactive
+
+    Returns:
+        int: Number of sailors updated
+    """
+    decayed = DecayRun.objects.filter(season=current_season).exists()
+    empty = (DEFAULT_RATING, 0, -1, -1)
+    sailors = []
+
+    for sailor_id, rating, count, first, last in Sailor.objects.values_list(
+        'id', 'elo_rating', 'regatta_count', 'first_season', 'last_season'
+    ):
+        new_rating, new_count, new_first, new_last = values.get(sailor_id, empty)
+        new_first = get_season_from_ordinal(new_first) if new_first >= 0 else ''
+        new_last = get_season_from_ordinal(new_last) if new_last >= 0 else ''
+        if decayed and new_last != current_season:
+            new_rating *= INACTIVE_DECAY
+        if (rating, count, first, last) != (new_rating, new_count, new_first, new_last):
+            sailors.append(Sailor(
+                id=sailor_id,
+                elo_rating=new_rating,
+                regatta_count=new_count,
+                first_season=new_first,
+                last_season=new_last,
+            ))
+
+    Sailor.objects.bulk_update(
+        sailors,
+        ['elo_rating', 'regatta_count', 'first_season', 'last_season'],
+        batch_size=batch_size
+    )
+    return len(sailors)
+
+def save_result_changes(history, result_changes, regattas=None, batch_size=500):
+    """
+    Write the replayed ELO change of the results in the history, touching
+    only results whose stored change differs
+
+    Args:
+        history (RatingHistory): Replayed history
+        result_changes: ELO change per result of the history
+        regattas (QuerySet, optional): Regattas the history was loaded from
+
+    Returns:
+        int: Number of results updated
+    """
+    stored = Result.objects.all()
+    if regattas is not None:
+        stored = stored.filter(regatta__in=regattas.values('id'))
+    stored = dict(stored.values_list('id', 'elo_change'))
+
+    results = [
+        Result(id=result_id, elo_change=change)
+        for result_id, change in zip(history.result_ids.tolist(), result_changes.tolist())
+        if stored.get(result_id) != change
+    ]
+    Result.objects.bulk_update(results, ['elo_change'], batch_size=batch_size)
+    return len(results)
+
+def save_snapshots(history, replay, regattas=None, batch_size=1000):
+    """
+    Bring the rating snapshots of the regattas in the history in line with
+    the replay, touching only snapshots that were added, changed or dropped
+
+    Args:
+        history (RatingHistory): Replayed history
+        replay (ReplayResult): Output of replay_history
+        regattas (QuerySet, optional): Regattas the history was loaded from
+
+    Returns:
+        int: Number of snapshots created, updated or deleted
+    """
+    stored = RatingSnapshot.objects.all()
+    if regattas is not None:
+        stored = stored.filter(regatta__in=regattas.values('id'))
+    stored = {
+        (sailor_id, regatta_id): (snapshot_id, snapshot_date, before, after)
+        for snapshot_id, sailor_id, regatta_id, snapshot_date, before, after in stored.values_list(
+            'id', 'sailor_id', 'regatta_id', 'date', 'rating_before', 'rating_after'
+        )
+    }
+
+    regatta_ids = history.regatta_ids[replay.snapshot_regattas].tolist()
+    sailor_ids = history.sailor_ids[replay.snapshot_sailors].tolist()
+    dates = [history.regatta_dates[regatta] for regatta in replay.snapshot_regattas.tolist()]
+
+    created = []
+    updated = []
+    for regatta_id, sailor_id, regatta_date, before, after in zip(
+        regatta_ids,
+        sailor_ids,
+        dates,
+        replay.snapshot_before.tolist(),
+        replay.snapshot_after.tolist(),
+    ):
+        existing = stored.pop((sailor_id, regatta_id), None)
+        if existing is None:
+            created.append(RatingSnapshot(
+                sailor_id=sailor_id,
+                regatta_id=regatta_id,
+                date=regatta_date,
+                rating_before=before,
+                rating_after=after,
+            ))
+        elif existing[1:] != (regatta_date, before, after):
+            updated.append(RatingSnapshot(
+                id=existing[0],
+                date=regatta_date,
+                rating_before=before,
+                rating_after=after,
+            ))
+
+    # Whatever is left belongs to results that are gone
+    dropped = [existing[0] for existing in stored.values()]
+    for i in range(0, len(dropped), batch_size):
+        RatingSnapshot.objects.filter(id__in=dropped[i:i + batch_size]).delete()
+    RatingSnapshot.objects.bulk_update(updated, ['date', 'rating_before', 'rating_after'], batch_size=batch_size)
+    RatingSnapshot.objects.bulk_create(created, batch_size=batch_size)
+    return len(created) + len(updated) + len(dropped)
+
+def save_checkpoints(history, checkpoints, current_season, base=None):
+    """
+    Store the season checkpoints taken during a replay
+
+    Args:
+        history (RatingHistory): Replayed history
+        checkpoints: (regatta index, ReplayState) pairs from replay_history
+        current_season (str): Season the replay weighted seasons against
+        base (dict, optional): Values of sailors outside the history, for
+            incremental replays
+    """
+    for regatta, state in checkpoints:
+        values = dict(base or {})
+        values.update(state.as_dict())
+        RatingCheckpoint.objects.update_or_create(
+            season=history.regatta_seasons[regatta],
+            defaults={
+                'date': history.regatta_dates[regatta],
+                'first_regatta_id': int(history.regatta_ids[regatta]),
+                'current_season': current_season,
+                'data': ReplayState.from_dict(values).to_data(),
+            }
+        )
+
+def recalculate_all(current_season=None, workers=1):
+    """
+    Replay the full history and rebuild every rating and checkpoint
+
+    Args:
+        current_season (str, optional): Override for current season
+        workers (int): Number of worker processes for the replay
+
+    Returns:
+        RatingHistory: The replayed history
+    """
+    if not current_season:
+        current_season = get_current_season()
+
+    history = RatingHistory.load()
+    replay = replay_history(history, current_season=current_season, workers=workers)
+
+    with transaction.atomic():
+        save_sailor_values(replay.state.as_dict(), current_season)
+        save_result_changes(history, replay.result_changes)
+        save_snapshots(history, replay)
+        RatingCheckpoint.objects.all().delete()
+        save_checkpoints(history, replay.checkpoints, current_season)
+
+    return history
+
+def recalculate_from(start_date, current_season=None, workers=1):
+    """
+    Recalculate ratings after regattas dated start_date or later were added
+    or changed
+
+    Restores the latest season checkpoint before start_date and replays only
+    the regattas from that checkpoint onward. Falls back to a full replay
+    when there is no usable checkpoint.
+
+    Args:
+        start_date (date): Earliest date of any added or changed regatta
+        current_season (str, optional): Override for current season
+        workers (int): Number of worker processes for the replay
+
+    Returns:
+        RatingHistory: The replayed part of the history
+    """
+    if not current_season:
+        current_season = get_current_season()
+
+    checkpoint = RatingCheckpoint.objects.filter(
+        date__lt=start_date,
+        current_season=current_season
+    ).order_by('-date', '-first_regatta_id').first()
+
+    if checkpoint is None:
+        return recalculate_all(current_season, workers)
+
+    regattas = Regatta.objects.filter(
+        Q(date__gt=checkpoint.date) |
+        Q(date=checkpoint.date, id__gte=checkpoint.first_regatta_id)
+    )
+    history = RatingHistory.load(regattas)
+
+    base = ReplayState.from_data(checkpoint.data).as_dict()
+    replay = replay_history(
+        history,
+        state=ReplayState.from_dict(base, history.sailor_ids),
+        current_season=current_season,
+        season_ordinal=get_season_ordinal(checkpoint.season),
+        workers=workers
+    )
+
+    values = dict(base)
+    values.update(replay.state.as_dict())
+
+    with transaction.atomic():
+        save_sailor_values(values, current_season)
+        save_result_changes(history, replay.result_changes, regattas)
+        save_snapshots(history, replay, regattas)
+        RatingCheckpoint.objects.filter(
+            Q(date__gt=checkpoint.date) |
+            Q(date=checkpoint.date, first_regatta_id__gt=checkpoint.first_regatta_id)
+        ).delete()
+        save_checkpoints(history, replay.checkpoints, current_season, base=base)
+
+    return history
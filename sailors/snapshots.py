@@ -0,0 +1,44 @@
+# sailors/snapshots.py
+
+from django.db.models import OuterRef, Subquery
+
+from .models import RatingSnapshot, Sailor
+
+def ratings_as_of(as_of_date):
+    """
+    Get every sailor's rating as it stood at the end of a given date
+    
+    Uses the (sailor, date) snapshot index, so historical leaderboards need
+    no replay.
+    
+    Args:
+        as_of_date (date): Date to look up ratings for
+    
+    Returns:
+        QuerySet: Sailors that had sailed by that date, annotated with
+            rating_as_of and ordered from highest to lowest rating
+    """
+    latest = RatingSnapshot.objects.filter(
+        sailor=OuterRef('pk'),
+        date__lte=as_of_date
+    ).order_by('-date', '-regatta_id').values('rating_after')[:1]
+    
+    return Sailor.objects.annotate(
+        rating_as_of=Subquery(latest)
+    ).filter(
+        rating_as_of__isnull=False
+    ).select_related('school').order_by('-rating_as_of')
+
+def sailor_timeline(sailor):
+    """
+    Get a sailor's rating before and after every regatta they sailed
+    
+    Args:
+        sailor: Sailor object or id
+    
+    Returns:
+        QuerySet: RatingSnapshot objects in chronological order
+    """
+    return RatingSnapshot.objects.filter(
+        sailor=sailor
+    ).select_related('regatta').order_by('date', 'regatta_id')
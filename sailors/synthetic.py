@@ -0,0 +1,107 @@
+# sailors/synthetic.py
+
+import random
+from datetime import date, timedelta
+
+from .elo import get_season_ordinal, get_season_from_ordinal
+from .models import School, RegattaType, Regatta, Sailor, Result
+
+REGATTA_TYPE_WEIGHTS = {
+    "National Championship": 1.5,
+    "National Invitational": 1.3,
+    "District Championship": 1.2,
+    "In-District": 1.0,
+    "Promotional": 0.8,
+}
+
+def season_for_date(day):
+    """Season code a date falls in (fall is August through December)"""
+    year = day.year % 100
+    return f"f{year:02d}" if day.month >= 8 else f"s{year:02d}"
+
+def generate_history(sailor_count=2000, regatta_count=300, min_fleet=10, max_fleet=60,
+                     school_count=100, start_date=date(2021, 9, 1), seed=0):
+    """
+    Fill the database with a synthetic regatta history
+
+    Every regatta has an A and a B division. Each division has between
+    min_fleet and max_fleet boats, each sailed by a skipper and a crew who
+    share the boat's place.
+
+    Args:
+        sailor_count (int): Number of sailors to create
+        regatta_count (int): Number of regattas to create
+        min_fleet (int): Fewest boats in a division
+        max_fleet (int): Most boats in a division
+        school_count (int): Number of schools to spread sailors over
+        start_date (date): Date of the first regatta
+        seed (int): Random seed, so runs are repeatable
+
+    Returns:
+        dict: Number of schools, sailors, regattas and results created
+    """
+    rng = random.Random(seed)
+
+    regatta_types = [
+        RegattaType.objects.get_or_create(name=name, defaults={'weight': weight})[0]
+        for name, weight in REGATTA_TYPE_WEIGHTS.items()
+    ]
+
+    schools = School.objects.bulk_create([
+        School(name=f"Synthetic School {i}") for i in range(school_count)
+    ])
+
+    sailors = [
+        Sailor(
+            name=f"Synthetic Sailor {i} '{rng.randint(24, 29)}",
+            school=schools[i % school_count],
+        )
+        for i in range(sailor_count)
+    ]
+    for sailor in sailors:
+        sailor.set_name_columns()
+    sailors = Sailor.objects.bulk_create(sailors)
+
+    # Spread regattas over weekends, about fifteen per month
+    regattas = []
+    day = start_date
+    for i in range(regatta_count):
+        if i and i % 2 == 0:
+            day += timedelta(days=rng.choice([0, 7, 7, 14]))
+        regattas.append(Regatta(
+            name=f"Synthetic Regatta {i}",
+            url=f"https://synthetic.invalid/{i}",
+            date=day,
+            season=season_for_date(day),
+            regatta_type=rng.choice(regatta_types),
+        ))
+    regattas = Regatta.objects.bulk_create(regattas)
+
+    # Boats need two sailors each, across both divisions
+    max_fleet = max(min_fleet, min(max_fleet, sailor_count // 4))
+    results = []
+    for regatta in regattas:
+        fleet_size = rng.randint(min_fleet, max_fleet)
+        entrants = rng.sample(sailors, fleet_size * 4)
+        for d, division in enumerate(['A', 'B']):
+            places = list(range(1, fleet_size + 1))
+            rng.shuffle(places)
+            for boat, place in enumerate(places):
+                skipper = entrants[(d * fleet_size + boat) * 2]
+                crew = entrants[(d * fleet_size + boat) * 2 + 1]
+                results.append(Result(sailor=skipper, regatta=regatta, division=division,
+                                      position='Skipper', place=place))
+                results.append(Result(sailor=crew, regatta=regatta, division=division,
+                                      position='Crew', place=place))
+    Result.objects.bulk_create(results, batch_size=2000)
+
+    return {
+        'schools': len(schools),
+        'sailors': len(sailors),
+        'regattas': len(regattas),
+        'results': len(results),
+        'seasons': [
+            get_season_from_ordinal(ordinal)
+            for ordinal in sorted({get_season_ordinal(r.season) for r in regattas})
+        ],
+    }
@@ -1,3 +1,136 @@
-from django.test import TestCase
+import numpy as np
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from .elo import calculate_division_elo_changes, calculate_elo_change
+from .models import DecayRun, RatingCheckpoint, RatingSnapshot, Regatta, Result, Sailor
+from .replay import RatingHistory, build_waves, recalculate_all, recalculate_from, replay_history
+from .synthetic import generate_history
+
+def pairwise_elo_changes(ratings, places, k_factors, sailor_ids, **weights):
+    """Sum calculate_elo_change over every pair of results of different sailors"""
+    fleet_size = len(ratings)
+    return [
+        sum(
+            calculate_elo_change(
+                ratings[i], ratings[j], places[i], places[j],
+                k_factor=k_factors[i], fleet_size=fleet_size, **weights
+            )
+            for j in range(fleet_size) if sailor_ids[j] != sailor_ids[i]
+        )
+        for i in range(fleet_size)
+    ]
+
+class DivisionEloChangesTests(SimpleTestCase):
+    def assertMatchesPairwise(self, ratings, places, k_factors, sailor_ids, **weights):
+        expected = pairwise_elo_changes(ratings, places, k_factors, sailor_ids, **weights)
+        changes = calculate_division_elo_changes(ratings, places, k_factors, sailor_ids, **weights)
+        np.testing.assert_allclose(changes, expected, rtol=1e-9, atol=1e-9)
+
+    def test_ties(self):
+        self.assertMatchesPairwise(
+            ratings=[1600, 1450, 1500, 1500, 1380, 1720],
+            places=[1, 2, 2, 4, 4, 4],
+            k_factors=[32, 24, 16, 32, 20, 16],
+            sailor_ids=[1, 2, 3, 4, 5, 6],
+        )
+
+    def test_a_division_weight(self):
+        self.assertMatchesPairwise(
+            ratings=[1500, 1620, 1410, 1555, 1490],
+            places=[3, 1, 5, 2, 4],
+            k_factors=[32, 16, 32, 24, 20],
+            sailor_ids=[1, 2, 3, 4, 5],
+            regatta_weight=1.5,
+            division_weight=1.2,
+            season_weight=0.8,
+        )
+
+    def test_sailor_on_two_rows(self):
+        # Sailor 2 is on two boats, so those rows are never compared with each other
+        self.assertMatchesPairwise(
+            ratings=[1500, 1580, 1580, 1440, 1610],
+            places=[2, 1, 3, 3, 5],
+            k_factors=[32, 20, 20, 24, 16],
+            sailor_ids=[1, 2, 2, 3, 4],
+            division_weight=1.2,
+        )
+
+    def test_large_fleet(self):
+        rng = np.random.default_rng(0)
+        fleet_size = 40
+        self.assertMatchesPairwise(
+            ratings=rng.normal(1500, 150, fleet_size).tolist(),
+            places=rng.integers(1, fleet_size // 2, fleet_size).tolist(),
+            k_factors=rng.choice([16, 20, 24, 32], fleet_size).tolist(),
+            sailor_ids=rng.integers(0, fleet_size - 5, fleet_size).tolist(),
+            regatta_weight=1.2,
+            season_weight=0.9,
+        )
+
+class ParallelReplayTests(TestCase):
+    def test_parallel_replay_matches_sequential(self):
+        generate_history(sailor_count=600, regatta_count=24, min_fleet=4, max_fleet=8, school_count=10)
+        history = RatingHistory.load()
+
+        sequential = replay_history(history, current_season='s23', workers=1)
+        parallel = replay_history(history, current_season='s23', workers=3)
+
+        # The waves must actually run regattas side by side for the test to mean anything
+        self.assertTrue(any(len(wave) > 1 for wave in build_waves(history, range(len(history.regatta_ids)))))
+        np.testing.assert_array_equal(parallel.state.ratings, sequential.state.ratings)
+        np.testing.assert_array_equal(parallel.state.regatta_counts, sequential.state.regatta_counts)
+        np.testing.assert_array_equal(parallel.result_changes, sequential.result_changes)
+
+class IncrementalReplayTests(TestCase):
+    CURRENT_SEASON = 's23'
+
+    def get_ratings(self):
+        """Everything a replay writes, keyed so two replays can be compared"""
+        return {
+            'sailors': list(Sailor.objects.order_by('id').values_list(
+                'id', 'elo_rating', 'regatta_count', 'first_season', 'last_season'
+            )),
+            'results': list(Result.objects.order_by('id').values_list('id', 'elo_change')),
+            'snapshots': list(RatingSnapshot.objects.order_by('sailor_id', 'regatta_id').values_list(
+                'sailor_id', 'regatta_id', 'date', 'rating_before', 'rating_after'
+            )),
+            'checkpoints': list(RatingCheckpoint.objects.order_by('date').values_list(
+                'season', 'date', 'first_regatta_id', 'current_season', 'data'
+            )),
+        }
+
+    def assertSameRatings(self, first, second):
+        self.assertEqual(first.keys(), second.keys())
+        for key in first:
+            self.assertEqual(len(first[key]), len(second[key]), key)
+            for row, other in zip(first[key], second[key]):
+                self.assertEqual(len(row), len(other))
+                for value, other_value in zip(row, other):
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(value, other_value, places=9, msg=key)
+                    else:
+                        self.assertEqual(value, other_value, key)
+
+    def test_recalculate_from_matches_recalculate_all(self):
+        history = generate_history(sailor_count=1000, regatta_count=120, min_fleet=4, max_fleet=8, school_count=10)
+        self.assertGreaterEqual(len(history['seasons']), 3)
+        # Decay has already run this season, so both replays have to re-apply it
+        DecayRun.objects.create(season=self.CURRENT_SEASON)
+        recalculate_all(self.CURRENT_SEASON)
+
+        # Swap the first two places of a regatta in the last season, but not its last regatta
+        regatta = Regatta.objects.order_by('-date', '-id')[10]
+        first, second = Result.objects.filter(regatta=regatta, division='A', place__in=[1, 2]).order_by('place')[:2]
+        Result.objects.filter(regatta=regatta, division='A', place=first.place).update(place=-1)
+        Result.objects.filter(regatta=regatta, division='A', place=second.place).update(place=first.place)
+        Result.objects.filter(regatta=regatta, division='A', place=-1).update(place=second.place)
+
+        replayed = recalculate_from(regatta.date, self.CURRENT_SEASON)
+        # The replay must have started from a checkpoint, not fallen back to a
+        # full one, and left sailors out that only the checkpoint knows about
+        self.assertLess(len(replayed.regatta_ids), Regatta.objects.count())
+        self.assertLess(len(replayed.sailor_ids), Sailor.objects.filter(result__isnull=False).distinct().count())
+        incremental = self.get_ratings()
+
+        recalculate_all(self.CURRENT_SEASON)
+        self.assertSameRatings(incremental, self.get_ratings())
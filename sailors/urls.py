@@ -7,6 +7,8 @@ urlpatterns = [
     path('sailors/', views.sailor_list, name='sailor_list'),
     path('scrape/', views.scrape_form, name='scrape_form'),
     path('scrape/execute/', views.execute_scrape, name='execute_scrape'),
+    path('scrape/jobs/<int:job_id>/', views.scrape_job_status, name='scrape_job_status'),
+    path('scrape/jobs/<int:job_id>/events/', views.scrape_job_events, name='scrape_job_events'),
     path('reset-database/', views.reset_database, name='reset_database'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
@@ -0,0 +1,149 @@
+# sailors/whatif.py
+
+import hashlib
+import os
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Ord
+
+from .models import Regatta, RegattaType, Result, Sailor
+from .replay import RatingHistory, replay_history
+
+# History kept in memory by this process, as (fingerprint, RatingHistory)
+_cached_history = None
+
+def get_history_cache_path():
+    """File the columnar results snapshot is cached in"""
+    return getattr(settings, 'RATING_HISTORY_CACHE', os.path.join(settings.BASE_DIR, 'rating_history.npz'))
+
+def get_history_fingerprint():
+    """
+    Summarize the rows a replay depends on, so a stale snapshot is noticed
+
+    Regattas are few, so every column a replay reads from them (date,
+    season, type and type weight) is hashed row by row. Results are
+    summarized in the database: besides the count and highest id, each of
+    their replayed columns is summed weighted by the result id, so moving a
+    place, sailor, division or regatta from one result to another changes
+    the fingerprint as well.
+
+    Returns:
+        str: Fingerprint of the Regatta, RegattaType and Result tables
+    """
+    digest = hashlib.sha256()
+    for row in Regatta.objects.order_by('id').values_list(
+        'id', 'date', 'season', 'regatta_type_id', 'regatta_type__name', 'regatta_type__weight'
+    ):
+        digest.update(repr(row).encode('utf-8'))
+
+    results = Result.objects.aggregate(
+        count=Count('id'),
+        last=Max('id'),
+        places=Sum(F('id') * F('place')),
+        sailors=Sum(F('id') * F('sailor_id')),
+        regattas=Sum(F('id') * F('regatta_id')),
+        divisions=Sum(F('id') * Ord('division')),
+    )
+    return (
+        f"{digest.hexdigest()}:{results['count']}:{results['last']}:{results['places']}:"
+        f"{results['sailors']}:{results['regattas']}:{results['divisions']}"
+    )
+
+def get_cached_history(refresh=False):
+    """
+    Get the full rating history from memory, the snapshot file or the database
+
+    The database is only read in full when the snapshot is missing or out of
+    date, in which case a new snapshot is written.
+
+    Args:
+        refresh (bool): Ignore any cached snapshot
+
+    Returns:
+        RatingHistory: The full history
+    """
+    global _cached_history
+
+    fingerprint = get_history_fingerprint()
+
+    if not refresh and _cached_history and _cached_history[0] == fingerprint:
+        return _cached_history[1]
+
+    path = get_history_cache_path()
+    history = None
+
+    if not refresh and os.path.exists(path):
+        try:
+            history, saved_fingerprint = RatingHistory.from_file(path)
+            if saved_fingerprint != fingerprint:
+                history = None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable rating history cache {path}: {e}")
+            history = None
+
+    if history is None:
+        history = RatingHistory.load()
+        history.save(path, fingerprint)
+
+    _cached_history = (fingerprint, history)
+    return history
+
+def rank_order(ratings):
+    """Rank of each rating, 1 for the highest"""
+    ranks = np.empty(len(ratings), dtype=np.int64)
+    ranks[np.argsort(-ratings, kind='stable')] = np.arange(1, len(ratings) + 1)
+    return ranks
+
+def compare_regatta_weights(weights, top=25, current_season=None, refresh=False):
+    """
+    Replay the history in memory with some regatta type weights overridden
+
+    Nothing is written to the database.
+
+    Args:
+        weights (dict): Map of regatta type name to the weight to try
+        top (int): Number of sailors to return
+        current_season (str, optional): Override for current season
+        refresh (bool): Reload the history from the database
+
+    Returns:
+        dict: 'leaderboard' with the top sailors under the new weights and
+            'movers' with the largest rank changes among them
+    """
+    unknown = set(weights) - set(RegattaType.objects.values_list('name', flat=True))
+    if unknown:
+        raise ValueError(f"Unknown regatta types: {', '.join(sorted(unknown))}")
+
+    history = get_cached_history(refresh)
+    baseline = replay_history(history, current_season=current_season).state.ratings
+    what_if = replay_history(history.with_weights(weights), current_season=current_season).state.ratings
+
+    baseline_ranks = rank_order(baseline)
+    what_if_ranks = rank_order(what_if)
+    leaders = np.argsort(what_if_ranks)[:top]
+
+    sailors = Sailor.objects.select_related('school').in_bulk(history.sailor_ids[leaders].tolist())
+
+    leaderboard = []
+    for index in leaders.tolist():
+        sailor = sailors.get(int(history.sailor_ids[index]))
+        leaderboard.append({
+            'sailor_id': int(history.sailor_ids[index]),
+            'name': sailor.name if sailor else '',
+            'school': sailor.school.name if sailor else '',
+            'rank': int(what_if_ranks[index]),
+            'rating': float(what_if[index]),
+            'baseline_rank': int(baseline_ranks[index]),
+            'baseline_rating': float(baseline[index]),
+            'rank_change': int(baseline_ranks[index] - what_if_ranks[index]),
+        })
+
+    movers = sorted(leaderboard, key=lambda row: -abs(row['rank_change']))
+
+    return {
+        'weights': weights,
+        'leaderboard': leaderboard,
+        'movers': [row for row in movers if row['rank_change']][:10],
+    }
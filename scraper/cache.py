@@ -0,0 +1,209 @@
+# scraper/cache.py
+"""
+On-disk HTTP cache for scraped pages
+
+Each URL is stored as a body file and a JSON file with its ETag and
+Last-Modified headers. Later fetches send If-None-Match/If-Modified-Since
+and reuse the stored body when the server answers 304 Not Modified. A
+policy can also declare a stored page final, in which case it is served
+without any request at all.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .transport import write_file
+
+# Regattas still not Official this many days after their listed start date
+# are taken as abandoned rather than running
+SETTLE_DAYS = 30
+
+class PageCache:
+    """
+    Conditional-GET cache keyed by URL
+
+    Args:
+        directory (str): Directory the pages are stored in
+        policy (callable, optional): policy(url, entry, cache) returning True
+            when the stored page can be served without revalidating it
+    """
+
+    def __init__(self, directory, policy=None):
+        self.directory = directory
+        self.policy = policy
+        self.stats = {'fresh': 0, 'not_modified': 0, 'fetched': 0, 'bytes_received': 0}
+        self._stats_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def paths(self, url):
+        """Metadata and body file of a URL"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.body")
+
+    def load(self, url):
+        """Stored metadata of a URL, or None"""
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url or not os.path.exists(body_path):
+            return None
+        return entry
+
+    def store(self, url, response):
+        """Store a 200 response for a URL with its validators"""
+        meta_path, body_path = self.paths(url)
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'encoding': response.encoding,
+            'fetched_at': time.time(),
+        }
+
+        # The body goes first, so metadata never points at a missing page
+        write_file(body_path, response.content)
+        write_file(meta_path, json.dumps(entry).encode())
+
+    def cached_response(self, url, entry):
+        """Build a response from a stored page"""
+        _, body_path = self.paths(url)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.encoding = entry.get('encoding')
+        response.headers = CaseInsensitiveDict({'Content-Type': entry.get('content_type') or 'text/html'})
+        response.from_cache = True
+        return response
+
+    def count(self, key, received=0):
+        with self._stats_lock:
+            self.stats[key] += 1
+            self.stats['bytes_received'] += received
+
+    def get(self, session, url, **kwargs):
+        """
+        GET a URL through the cache
+
+        Args:
+            session: requests.Session to fetch with
+            url (str): URL to fetch
+
+        Returns:
+            requests.Response: The live response, or a response rebuilt from
+                the stored body with from_cache set
+        """
+        entry = self.load(url)
+
+        if entry and self.policy and self.policy(url, entry, self):
+            self.count('fresh')
+            return self.cached_response(url, entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.count('not_modified')
+            return self.cached_response(url, entry)
+
+        self.count('fetched', len(response.content))
+        if response.status_code == 200:
+            self.store(url, response)
+        response.from_cache = False
+        return response
+
+def closed_season_policy(current_season=None, base_url=None, settle_days=SETTLE_DAYS):
+    """
+    Policy that never refetches pages of regattas that are over
+
+    Whether a regatta is over comes from its row in the season listing
+    stored in the same cache, not from the calendar end of its season: fall
+    regattas run into January. A regatta page is final once the listing
+    shows the regatta as Official and the page was stored after that
+    listing, or once the page was stored more than settle_days after the
+    regatta's listed start date, for regattas left "In progress" for good.
+    A season listing is final once its season is before the current one and
+    every regatta in it is over by the same rules.
+    """
+    from datetime import datetime, timedelta
+    from sailors.elo import get_current_season, get_season_ordinal
+    from sailors.ingest.discover import parse_season_listing
+    from .client import get_base_url
+    from .parsing import parse_html
+
+    base_url = (base_url or get_base_url()).rstrip('/')
+    page_pattern = re.compile(r'^' + re.escape(base_url) + r'/([fs]\d{2})/([^/]*)')
+    settle = timedelta(days=settle_days)
+
+    # Parsed listings by URL, kept until the stored listing changes
+    listings = {}
+    lock = threading.Lock()
+
+    def get_listing(cache, season):
+        """(fetched_at, regattas by URL slug) of the stored listing of a season, or None"""
+        url = f"{base_url}/{season}/"
+        entry = cache.load(url)
+        if entry is None:
+            return None
+        with lock:
+            listing = listings.get(url)
+        if listing and listing[0] == entry['fetched_at']:
+            return listing
+
+        soup = parse_html(cache.cached_response(url, entry).text, only='table')
+        regattas = {}
+        for regatta in parse_season_listing(soup, url, verbose=False):
+            match = page_pattern.match(regatta['url'])
+            if match and match.group(2):
+                regattas[match.group(2)] = regatta
+
+        listing = (entry['fetched_at'], regattas)
+        with lock:
+            listings[url] = listing
+        return listing
+
+    def is_over(regatta, listed_at, fetched_at):
+        """Whether a page of a regatta stored at fetched_at is final"""
+        if regatta.get('status', '').startswith('Official') and fetched_at >= listed_at:
+            return True
+        fetched_date = datetime.fromtimestamp(fetched_at).date()
+        return bool(regatta.get('date')) and fetched_date > regatta['date'] + settle
+
+    def policy(url, entry, cache):
+        match = page_pattern.match(url)
+        if not match:
+            return False
+        season, slug = match.groups()
+        listing = get_listing(cache, season)
+        if listing is None:
+            return False
+        listed_at, regattas = listing
+
+        if slug:
+            regatta = regattas.get(slug)
+            return regatta is not None and is_over(regatta, listed_at, entry['fetched_at'])
+
+        if get_season_ordinal(season) >= get_season_ordinal(current_season or get_current_season()):
+            return False
+        return bool(regattas) and all(is_over(regatta, listed_at, listed_at) for regatta in regattas.values())
+
+    return policy
@@ -0,0 +1,229 @@
+# scraper/client.py
+"""
+Shared HTTP client for every scraping code path
+
+All pages go through one requests.Session, so connections to each host are
+kept alive and reused instead of paying for a new TCP and TLS handshake on
+every page.
+
+SCRAPE_TRANSPORT picks where pages come from: 'live' (the network),
+'archive' (files under SCRAPE_ARCHIVE_DIR, no network at all) or 'record'
+(the network, saving a copy of every page into SCRAPE_ARCHIVE_DIR). See
+scraper/transport.py.
+"""
+import os
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import CommandError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .transport import TRANSPORTS, ArchiveAdapter, RecordingAdapter
+
+# Status codes worth retrying; anything else is returned to the caller
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Page cache, False until first use and None when disabled
+_cache = False
+
+class ScrapeSession(requests.Session):
+    """
+    requests.Session with a pooled, retrying adapter, a default timeout and
+    timing hooks
+
+    Timing hooks are called after every request with the method, URL,
+    status code (None if the request failed) and elapsed seconds.
+    """
+
+    def __init__(self, timeout=None, retries=None, pool_size=None, backoff=None,
+                 transport=None, archive_dir=None):
+        super().__init__()
+        self.timeout = timeout if timeout is not None else getattr(settings, 'SCRAPE_TIMEOUT', 30)
+        self.timing_hooks = []
+        self.transport = transport or get_transport()
+        self.archive_dir = archive_dir or get_archive_dir()
+
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown scrape transport {self.transport!r}, expected one of {', '.join(TRANSPORTS)}")
+
+        if self.transport == 'archive':
+            adapter = ArchiveAdapter(self.archive_dir)
+            self.mount('https://', adapter)
+            self.mount('http://', adapter)
+            return
+
+        if retries is None:
+            retries = getattr(settings, 'SCRAPE_RETRIES', 3)
+        if pool_size is None:
+            pool_size = max(10, getattr(settings, 'SCRAPE_MAX_WORKERS', 8))
+        if backoff is None:
+            backoff = getattr(settings, 'SCRAPE_BACKOFF', 0.5)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=['GET', 'HEAD'],
+            # Hand the last 5xx back so raise_for_status reports it
+            raise_on_status=False,
+        )
+        if self.transport == 'record':
+            adapter = RecordingAdapter(self.archive_dir, pool_connections=10, pool_maxsize=pool_size, max_retries=retry)
+        else:
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+
+        started = time.perf_counter()
+        status = None
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in list(self.timing_hooks):
+                hook(method, url, status, elapsed)
+
+def get_base_url():
+    """Scoring site set by SCRAPE_BASE_URL, without a trailing slash"""
+    return getattr(settings, 'SCRAPE_BASE_URL', 'https://scores.hssailing.org').rstrip('/')
+
+def get_season_url(season):
+    """URL of a season's regatta listing, e.g. https://scores.hssailing.org/f24/"""
+    return f"{get_base_url()}/{season}/"
+
+def get_transport():
+    """Transport set by SCRAPE_TRANSPORT, 'live' by default"""
+    return getattr(settings, 'SCRAPE_TRANSPORT', 'live') or 'live'
+
+def get_archive_dir():
+    """Archive directory set by SCRAPE_ARCHIVE_DIR"""
+    return str(getattr(settings, 'SCRAPE_ARCHIVE_DIR', '') or os.path.join(settings.BASE_DIR, 'scrape_archive'))
+
+def configure(transport=None, archive_dir=None):
+    """
+    Replace the shared session, e.g. for a management command run offline
+
+    Args:
+        transport (str, optional): 'live', 'archive' or 'record'
+        archive_dir (str, optional): Archive directory to read or write
+
+    Returns:
+        ScrapeSession: The new shared session
+    """
+    global _session, _cache
+
+    session = ScrapeSession(transport=transport, archive_dir=archive_dir)
+    with _session_lock:
+        old, _session = _session, session
+        # Settings may have changed too, so set the cache up again on next use
+        _cache = False
+    if old is not None:
+        # Keep timing hooks already registered on the old session
+        session.timing_hooks.extend(old.timing_hooks)
+        old.close()
+    return session
+
+
+def add_transport_arguments(parser):
+    """Add the --archive and --record options shared by the scraping management commands"""
+    parser.add_argument(
+        '--archive',
+        metavar='DIR',
+        help='Read pages from an archive directory instead of the network',
+    )
+    parser.add_argument(
+        '--record',
+        metavar='DIR',
+        help='Save every fetched page into an archive directory',
+    )
+
+def configure_from_options(options):
+    """
+    Replace the shared session as asked by the options of
+    add_transport_arguments; without either option the session is left alone
+
+    Raises:
+        CommandError: If both --archive and --record are given
+    """
+    if options['archive'] and options['record']:
+        raise CommandError('Use only one of --archive and --record')
+    if options['archive']:
+        configure(transport='archive', archive_dir=options['archive'])
+    elif options['record']:
+        configure(transport='record', archive_dir=options['record'])
+
+def get_session():
+    """The process-wide scraping session, created on first use"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = ScrapeSession()
+    return _session
+
+def get_cache():
+    """
+    The page cache configured by SCRAPE_CACHE_DIR, or None when disabled
+    
+    With SCRAPE_CACHE_CLOSED_SEASONS set, stored pages of regattas the
+    season listing shows as over are served without revalidating them.
+    """
+    global _cache
+
+    if _cache is False:
+        with _session_lock:
+            if _cache is False:
+                from .cache import PageCache, closed_season_policy
+
+                directory = getattr(settings, 'SCRAPE_CACHE_DIR', None)
+                if directory:
+                    policy = closed_season_policy() if getattr(settings, 'SCRAPE_CACHE_CLOSED_SEASONS', False) else None
+                    _cache = PageCache(directory, policy)
+                else:
+                    _cache = None
+    return _cache
+
+def get(url, cache=True, **kwargs):
+    """
+    GET a page through the shared session
+
+    Args:
+        url (str): URL to fetch
+        cache (bool): Use the page cache when one is configured
+
+    Returns:
+        requests.Response: The response
+    """
+    session = get_session()
+
+    # Archived pages are already local, and recording needs full responses
+    # rather than the cache's 304s, so the cache only sits in front of live
+    page_cache = get_cache() if cache and session.transport == 'live' else None
+    if page_cache:
+        return page_cache.get(session, url, **kwargs)
+    return session.get(url, **kwargs)
+
+def add_timing_hook(hook):
+    """Call hook(method, url, status, elapsed) after every request"""
+    get_session().timing_hooks.append(hook)
+
+def remove_timing_hook(hook):
+    """Stop calling a hook added with add_timing_hook"""
+    hooks = get_session().timing_hooks
+    if hook in hooks:
+        hooks.remove(hook)
@@ -0,0 +1,52 @@
+# scraper/parsing.py
+"""
+HTML parser backend shared by the scrapers
+
+Pages are parsed with lxml when it is installed, falling back to the
+pure-Python html.parser. A restricted parse only builds the elements the
+caller reads, such as the results table, instead of the whole page.
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+from django.conf import settings
+
+# Fastest first
+BACKENDS = ['lxml', 'html.parser']
+
+_backend = None
+
+def backend_available(backend):
+    """Whether BeautifulSoup can use a parser backend here"""
+    try:
+        BeautifulSoup('', backend)
+    except Exception:
+        return False
+    return True
+
+def get_parser_backend():
+    """
+    Parser backend to use, SCRAPE_PARSER if set and available, otherwise
+    the fastest available backend
+    """
+    global _backend
+
+    if _backend is None:
+        preferred = getattr(settings, 'SCRAPE_PARSER', None)
+        candidates = [preferred] + BACKENDS if preferred else BACKENDS
+        _backend = next(backend for backend in candidates if backend_available(backend))
+    return _backend
+
+def parse_html(html, only=None, backend=None):
+    """
+    Parse a page into a BeautifulSoup tree
+
+    Args:
+        html (str): Page HTML
+        only (str or list, optional): Tag names to keep, e.g. 'table'; other
+            elements are skipped while parsing
+        backend (str, optional): Parser backend, defaults to get_parser_backend()
+
+    Returns:
+        BeautifulSoup: Parsed page
+    """
+    parse_only = SoupStrainer(only) if only else None
+    return BeautifulSoup(html, backend or get_parser_backend(), parse_only=parse_only)
@@ -0,0 +1,143 @@
+# scraper/ratelimit.py
+"""
+Adaptive per-host rate limiting
+
+Each host gets a token bucket whose rate adapts to how the host answers:
+429 and 5xx responses (including ones the session retried on its own) halve
+the rate, and every clean response raises it a little, up to a ceiling.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Statuses that mean the host wants us to slow down
+BACKOFF_STATUSES = (429, 500, 502, 503, 504)
+
+class TokenBucket:
+    """
+    Token bucket with an additive-increase, multiplicative-decrease rate
+
+    Args:
+        rate (float): Starting requests per second
+        min_rate (float): Slowest the bucket backs off to
+        max_rate (float): Fastest the bucket speeds up to
+        burst (int): Tokens that can build up while idle
+        increase (float): Requests per second added after a clean response
+        decrease (float): Factor the rate is multiplied by on a backoff status
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=10.0, burst=2, increase=0.25, decrease=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # Earliest time a token may be handed out, pushed back by Retry-After
+        self.paused_until = 0.0
+        self.stats = {'requests': 0, 'backoffs': 0, 'waited': 0.0}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats['requests'] += 1
+                    self.stats['waited'] += waited
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def success(self):
+        """Speed up after a clean response"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def backoff(self, retry_after=None):
+        """Slow down after a 429, 5xx or connection failure"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            self.stats['backoffs'] += 1
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def record(self, response):
+        """
+        Adapt the rate to a response
+
+        Statuses the session already retried count as well, so a host that
+        needed retries is slowed down even when the last attempt succeeded.
+        """
+        statuses = [response.status_code]
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        if retries is not None:
+            statuses += [attempt.status for attempt in retries.history if attempt.status]
+
+        if any(status in BACKOFF_STATUSES for status in statuses):
+            self.backoff(parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            self.success()
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header given in seconds, or None"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, created on first use
+
+    Keyword arguments are passed to every TokenBucket.
+    """
+
+    def __init__(self, **bucket_options):
+        self.bucket_options = bucket_options
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        """The bucket for a URL's host"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(**self.bucket_options)
+            return self.buckets[host]
+
+    def get(self, get, url, retries=2, **kwargs):
+        """
+        Send get(url, **kwargs) once the host's bucket allows it, and adapt
+        the bucket to the outcome
+
+        A 429 is sent again, after backing off, up to retries times; the
+        session already retries 5xx responses itself.
+
+        Returns:
+            requests.Response: The response
+        """
+        bucket = self.bucket(url)
+        for attempt in range(retries + 1):
+            bucket.acquire()
+            try:
+                response = get(url, **kwargs)
+            except Exception:
+                bucket.backoff()
+                raise
+            bucket.record(response)
+            if response.status_code != 429:
+                break
+        return response
@@ -0,0 +1,144 @@
+# scraper/standin.py
+"""
+Local stand-in for the scoring site, for benchmarks and offline runs
+
+Serves archived pages (see scraper/transport.py) over HTTP, so the whole
+network path - sessions, retries, the thread pool - is exercised without
+touching the real site. Latency and server errors can be injected to see
+how ingestion copes with a slow or flaky host.
+
+Unlike the archive transport, pages missing from the archive fall back to
+the saved pages kept next to the code, so a benchmark can run without a
+recorded archive: season listings to the saved {season}_debug.html files,
+and every regatta /sailors page to regatta_sailors.html. There is no saved
+school page, so school pages are served only from a recorded archive.
+"""
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .transport import find_archived_page, read_page
+
+# Paths on the scoring site, whichever host it is served from
+# /f24/ -> f24_debug.html
+SEASON_LISTING_PATTERN = re.compile(r'^/([fs]\d{2})/?$')
+
+# /f24/some-regatta/sailors -> regatta_sailors.html
+REGATTA_SAILORS_PATTERN = re.compile(r'^/[fs]\d{2}/[^/]+/sailors/?$')
+
+def find_standin_page(directory, url):
+    """
+    File to serve for a URL, or None
+
+    Looks in the archive first, then for the saved season listing or
+    regatta page in the directory.
+    """
+    archived = find_archived_page(directory, url)
+    if archived:
+        return archived
+
+    path = urlsplit(url).path
+    match = SEASON_LISTING_PATTERN.match(path)
+    if match:
+        saved = os.path.join(directory, f"{match.group(1)}_debug.html")
+    elif REGATTA_SAILORS_PATTERN.match(path):
+        saved = os.path.join(directory, 'regatta_sailors.html')
+    else:
+        return None
+    return saved if os.path.exists(saved) else None
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers GETs from the server's archive"""
+
+    def do_GET(self):
+        server = self.server
+        delay, fail = server.draw()
+
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            server.count('errors')
+            self.send_error(503, 'Injected error')
+            return
+
+        path = find_standin_page(server.directory, server.origin + self.path)
+        if not path:
+            server.count('not_found')
+            self.send_error(404, 'Not in archive')
+            return
+
+        body = read_page(path)
+        server.count('served')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server serving an archive directory on localhost
+
+    Args:
+        directory (str): Archive directory to serve pages from
+        latency (float): Mean seconds added before every response
+        jitter (float): Fraction the latency varies by either way
+        error_rate (float): Fraction of requests answered with a 503
+        origin (str): Site the archived pages were recorded from
+        seed (int): Random seed, so injected errors are repeatable
+        port (int): Port to listen on, 0 picks a free one
+    """
+    daemon_threads = True
+
+    def __init__(self, directory, latency=0.0, jitter=0.5, error_rate=0.0,
+                 origin='https://scores.hssailing.org', seed=0, port=0):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.origin = origin.rstrip('/')
+        self.stats = {'requests': 0, 'served': 0, 'not_found': 0, 'errors': 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """URL the server is reachable at, to use as SCRAPE_BASE_URL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self):
+        """Latency and whether to fail for the next request"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency * self._rng.uniform(1 - self.jitter, 1 + self.jitter) if self.latency else 0
+            fail = self._rng.random() < self.error_rate
+        return delay, fail
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self):
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
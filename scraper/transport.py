@@ -0,0 +1,116 @@
+# scraper/transport.py
+"""
+Transports for the scraping session
+
+live     fetch pages from the network
+archive  serve pages from a local directory, without touching the network
+record   fetch pages from the network and save a gzip copy in the archive
+
+Archived pages are stored by host and path, e.g.
+scores.hssailing.org/f24/some-regatta/sailors/index.html.gz. A page that was
+never archived is answered with a 404.
+"""
+import gzip
+import os
+import re
+import threading
+from urllib.parse import urlsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+TRANSPORTS = ('live', 'archive', 'record')
+
+def safe_name(part):
+    """Path component with anything unsafe for a file name replaced"""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', part)
+
+def archive_path(directory, url):
+    """File a page is archived under, without the compression suffix"""
+    parts = urlsplit(url)
+    segments = [
+        safe_name(segment)
+        for segment in parts.path.split('/')
+        if segment and segment not in ('.', '..')
+    ]
+    if parts.query:
+        segments.append(safe_name(parts.query))
+    return os.path.join(directory, safe_name(parts.netloc.lower()), *segments, 'index.html')
+
+def find_archived_page(directory, url):
+    """
+    Archived file for a URL, or None
+
+    Looks for the compressed archive file, then for a plain one.
+    """
+    archived = archive_path(directory, url)
+    candidates = [archived + '.gz', archived]
+    return next((candidate for candidate in candidates if os.path.exists(candidate)), None)
+
+def write_file(path, data, opener=open):
+    """
+    Write bytes to a file through a temporary file, so a reader never sees
+    half of it
+
+    Args:
+        path (str): File to write
+        data (bytes): Contents
+        opener: open, or gzip.open to compress
+    """
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with opener(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+def save_page(directory, url, body):
+    """Write a page into the archive, gzip-compressed"""
+    path = archive_path(directory, url) + '.gz'
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_file(path, body, opener=gzip.open)
+
+def read_page(path):
+    """Body of an archived file"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+class ArchiveAdapter(BaseAdapter):
+    """Transport adapter that answers every request from the archive"""
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8'})
+
+        path = find_archived_page(self.directory, request.url) if request.method in ('GET', 'HEAD') else None
+        if path:
+            response.status_code = 200
+            response._content = read_page(path) if request.method == 'GET' else b''
+        else:
+            response.status_code = 404
+            response.reason = 'Not in archive'
+            response._content = b''
+        return response
+
+    def close(self):
+        pass
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that saves every successful GET into the archive"""
+
+    def __init__(self, directory, **kwargs):
+        self.directory = directory
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method == 'GET' and response.status_code == 200:
+            save_page(self.directory, request.url, response.content)
+        return response